@@ -1,21 +1,90 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 import json
 import csv
+import io
 import os
+from queue import Full
 from src.preprocessing.cleaner import DataCleaner
 from src.algorithms.apriori import AprioriMiner
 from src.algorithms.eclat import EclatMiner
+from src.algorithms.fpgrowth import FPGrowthMiner
+from src.algorithms.instrumentation import json_lines_hook
+from src.algorithms.model_artifact import MinedModel, save_model
+from src.algorithms.parallel import MAX_JOBS, resolve_n_jobs
+from src.algorithms.result_cache import MiningResultCache
+from src.algorithms.ruleset import RULE_METRICS
+from src.algorithms.sampling import SampledMiner, chernoff_margin, chernoff_sample_size
+from src.algorithms.topk import TopKRuleMiner
+from src.algorithms.transactions import TransactionStore
+from src.datasets.registry import DEFAULT_DATASET, Dataset, DatasetError, DatasetRegistry, Snapshot
+from src.jobs.manager import Job, JobCancelled, JobManager
 
 app = Flask(__name__)
 
-transactions_data = []
-cleaned_transactions = []
-preprocessing_report = {}
-apriori_miner = None
-eclat_miner = None
+datasets = DatasetRegistry(
+    int(os.environ.get('MAX_DATASETS', 16)),
+    int(os.environ.get('UPDATE_BATCH_SIZE', 100)),
+    float(os.environ.get('UPDATE_MAX_DELAY', 1.0))
+)
+datasets.create(DEFAULT_DATASET)
+model_path = os.environ.get('MINING_MODEL_PATH', 'data/model.bin')
+max_page_size = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+topk_max_expansions = int(os.environ.get('TOPK_MAX_EXPANSIONS', 50000))
+max_jobs = min(int(os.environ.get('MINING_MAX_JOBS', MAX_JOBS)), MAX_JOBS)
+mining_cache = MiningResultCache(directory=os.environ.get('MINING_CACHE_DIR'))
+job_manager = JobManager(
+    int(os.environ.get('MINING_WORKERS', 2)),
+    int(os.environ.get('MINING_QUEUE_SIZE', 16))
+)
+mining_hooks = [job_manager.hook]
+if os.environ.get('MINING_METRICS_LOG'):
+    mining_hooks.append(json_lines_hook(os.environ['MINING_METRICS_LOG']))
 products_list = []
 
 
+def dataset_model_path(name: str) -> str:
+    if name == DEFAULT_DATASET:
+        return model_path
+    root, ext = os.path.splitext(model_path)
+    return f'{root}.{name}{ext}'
+
+
+def load_model(dataset: Dataset):
+    path = dataset_model_path(dataset.name)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        model = MinedModel(path)
+    except ValueError as e:
+        print(f"Warning: {e}")
+        return None
+
+    dataset.install_model(model)
+    return model
+
+
+load_model(datasets.get(DEFAULT_DATASET))
+
+
+@app.errorhandler(DatasetError)
+def dataset_error(e):
+    return jsonify({'success': False, 'message': str(e)}), e.status
+
+
+def dataset_name() -> str:
+    name = request.args.get('dataset') or request.form.get('dataset')
+    if name is None and request.is_json:
+        name = (request.get_json(silent=True) or {}).get('dataset')
+    return name or DEFAULT_DATASET
+
+
+def current_dataset(create: bool = False) -> Dataset:
+    if create:
+        return datasets.create(dataset_name())
+    return datasets.get(dataset_name())
+
+
 def load_products():
     global products_list
     products_list = []
@@ -46,24 +115,36 @@ def get_products():
 
 @app.route('/api/transactions/create', methods=['POST'])
 def create_transaction():
-    global transactions_data
+    dataset = current_dataset(create=True)
     data = request.json
     items = data.get('items', [])
 
     if items:
-        transactions_data.append(items)
-        return jsonify({
+        cleaner = DataCleaner('data/products.csv')
+        cleaned, _ = cleaner.preprocess([items])
+        appended = dataset.append([items], cleaned)
+        total = dataset.stats.raw_transactions
+        response = {
             'success': True,
             'message': f'Transaction created with {len(items)} items',
-            'transaction_id': len(transactions_data),
-            'total_transactions': len(transactions_data)
-        })
+            'dataset': dataset.name,
+            'transaction_id': total,
+            'total_transactions': total,
+            'total_cleaned': dataset.stats.cleaned_transactions,
+            'pending_updates': appended['pending_updates'],
+            'stale_miners': appended['stale']
+        }
+        if appended['stale']:
+            response['message'] += (f"; {', '.join(appended['stale'])} results do not include it "
+                                    f"until mining is run again")
+
+        return jsonify(response)
     return jsonify({'success': False, 'message': 'No items provided'}), 400
 
 
 @app.route('/api/transactions/import', methods=['POST'])
 def import_transactions():
-    global transactions_data
+    dataset = current_dataset(create=True)
 
     if 'file' not in request.files:
         return jsonify({'success': False, 'message': 'No file provided'}), 400
@@ -73,22 +154,31 @@ def import_transactions():
         return jsonify({'success': False, 'message': 'No file selected'}), 400
 
     try:
-        content = file.read().decode('utf-8').splitlines()
-        reader = csv.DictReader(content)
-
-        transactions_data = []
-        for row in reader:
-            items_str = row.get('items', '').strip()
-            if items_str:
-                items = [item.strip() for item in items_str.split(',')]
-                transactions_data.append(items)
-            else:
-                transactions_data.append([])
+        cleaner = DataCleaner('data/products.csv')
+        lines = io.TextIOWrapper(file.stream, encoding='utf-8', newline='')
+
+        if request.form.get('preprocess', '').lower() in ('1', 'true', 'yes'):
+            store, report = cleaner.preprocess_to_store(cleaner.read_transactions(lines))
+            dataset.set_store(store, report, raw_retained=False)
+
+            return jsonify({
+                'success': True,
+                'message': f'Successfully imported and preprocessed {report["total_transactions"]} transactions',
+                'dataset': dataset.name,
+                'total_transactions': report['total_transactions'],
+                'report': report,
+                'report_string': cleaner.get_report_string(),
+                'cleaned_count': len(store)
+            })
+
+        transactions = list(cleaner.read_transactions(lines))
+        dataset.set_raw(transactions)
 
         return jsonify({
             'success': True,
-            'message': f'Successfully imported {len(transactions_data)} transactions',
-            'total_transactions': len(transactions_data)
+            'message': f'Successfully imported {len(transactions)} transactions',
+            'dataset': dataset.name,
+            'total_transactions': len(transactions)
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error importing file: {str(e)}'}), 500
@@ -96,49 +186,98 @@ def import_transactions():
 
 @app.route('/api/transactions/load-sample', methods=['POST'])
 def load_sample():
-    global transactions_data
+    dataset = current_dataset(create=True)
 
     try:
         cleaner = DataCleaner('data/products.csv')
-        transactions_data = cleaner.load_transactions('data/sample_transactions.csv')
+        transactions = cleaner.load_transactions('data/sample_transactions.csv')
+        dataset.set_raw(transactions)
 
         return jsonify({
             'success': True,
-            'message': f'Successfully loaded {len(transactions_data)} sample transactions',
-            'total_transactions': len(transactions_data)
+            'message': f'Successfully loaded {len(transactions)} sample transactions',
+            'dataset': dataset.name,
+            'total_transactions': len(transactions)
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error loading sample: {str(e)}'}), 500
 
 
+def page_args() -> tuple:
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 100, type=int)), max_page_size)
+    return offset, limit
+
+
+def decoded_rows(store: TransactionStore, start: int, stop: int):
+    items = store.items
+    for transaction in store.iter_range(start, stop):
+        yield [items[item_id] for item_id in transaction]
+
+
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
+    dataset = current_dataset()
+    offset, limit = page_args()
+    raw, total_raw = dataset.raw_page(offset, limit)
+    store = dataset.store
+    stop = min(offset + limit, len(store))
+
     return jsonify({
-        'raw_transactions': transactions_data,
-        'cleaned_transactions': cleaned_transactions,
-        'total_raw': len(transactions_data),
-        'total_cleaned': len(cleaned_transactions)
+        'raw_transactions': raw,
+        'cleaned_transactions': list(decoded_rows(store, min(offset, stop), stop)),
+        'raw_retained': dataset.raw_retained,
+        'total_raw': total_raw,
+        'total_cleaned': len(store),
+        'offset': offset,
+        'limit': limit
     })
 
 
+@app.route('/api/transactions/export', methods=['GET'])
+def export_transactions():
+    dataset = current_dataset()
+    kind = request.args.get('kind', 'cleaned')
+    if kind == 'raw':
+        if not dataset.raw_retained:
+            return jsonify({'success': False, 'message': 'Raw transactions were not kept for this dataset'}), 400
+        rows = dataset.raw_copy()
+    elif kind == 'cleaned':
+        store = dataset.store
+        rows = decoded_rows(store, 0, len(store))
+    else:
+        return jsonify({'success': False, 'message': "kind must be 'raw' or 'cleaned'"}), 400
+
+    return Response((json.dumps(row) + '\n' for row in rows), mimetype='application/x-ndjson')
+
+
 @app.route('/api/preprocess', methods=['POST'])
 def preprocess_data():
-    global cleaned_transactions, preprocessing_report
+    dataset = current_dataset()
+    if not dataset.raw_retained:
+        return jsonify({
+            'success': False,
+            'message': 'Transactions were imported preprocessed, import them again to re-clean'
+        }), 400
 
-    if not transactions_data:
+    transactions = dataset.raw_copy()
+    if not transactions:
         return jsonify({'success': False, 'message': 'No transactions to preprocess'}), 400
 
     try:
         cleaner = DataCleaner('data/products.csv')
-        cleaned_transactions, preprocessing_report = cleaner.preprocess(transactions_data)
+        cleaned, report = cleaner.preprocess(transactions)
+        store = TransactionStore.from_transactions(cleaned)
+        dataset.set_store(store, report)
         report_string = cleaner.get_report_string()
 
         return jsonify({
             'success': True,
             'message': 'Preprocessing completed',
-            'report': preprocessing_report,
+            'dataset': dataset.name,
+            'report': report,
             'report_string': report_string,
-            'cleaned_count': len(cleaned_transactions)
+            'cleaned_count': len(store)
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error during preprocessing: {str(e)}'}), 500
@@ -146,49 +285,266 @@ def preprocess_data():
 
 @app.route('/api/mine', methods=['POST'])
 def run_mining():
-    global apriori_miner, eclat_miner
-
-    if not cleaned_transactions:
+    dataset = current_dataset()
+    if not len(dataset.store):
         return jsonify({'success': False, 'message': 'No cleaned transactions. Please preprocess first.'}), 400
 
-    data = request.json
-    min_support = float(data.get('min_support', 0.2))
-    min_confidence = float(data.get('min_confidence', 0.5))
-
+    data = request.json or {}
     try:
-        apriori_miner = AprioriMiner(min_support, min_confidence)
-        apriori_metrics = apriori_miner.fit(cleaned_transactions)
+        plan = mining_plan(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': f'Invalid mining parameters: {str(e)}'}), 400
 
-        eclat_miner = EclatMiner(min_support, min_confidence)
-        eclat_metrics = eclat_miner.fit(cleaned_transactions)
+    if data.get('async'):
+        return submit_mining_job(dataset, plan)
 
-        return jsonify({
-            'success': True,
-            'message': 'Mining completed',
-            'apriori': apriori_metrics,
-            'eclat': eclat_metrics,
-            'parameters': {
-                'min_support': min_support,
-                'min_confidence': min_confidence
-            }
-        })
+    try:
+        source, store = dataset.snapshot_store()
+        miners, response = mine_results(plan, store)
+        response['dataset'] = dataset.name
+        response['installed'] = dataset.install(miners, store, source)
+        if not response['installed']:
+            response['success'] = False
+            response['message'] = 'Transactions were replaced while mining, results were not installed'
+            return jsonify(response), 409
+        return jsonify(response)
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error during mining: {str(e)}'}), 500
 
 
-@app.route('/api/recommendations/<item>', methods=['GET'])
-def get_recommendations(item):
-    if not apriori_miner or not eclat_miner:
-        return jsonify({'success': False, 'message': 'Please run mining first'}), 400
+@app.route('/api/mine/jobs', methods=['POST'])
+def create_mining_job():
+    dataset = current_dataset()
+    if not len(dataset.store):
+        return jsonify({'success': False, 'message': 'No cleaned transactions. Please preprocess first.'}), 400
 
     try:
-        item = item.lower()
+        plan = mining_plan(request.json or {})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': f'Invalid mining parameters: {str(e)}'}), 400
+
+    return submit_mining_job(dataset, plan)
+
+
+@app.route('/api/mine/jobs/<job_id>', methods=['GET'])
+def get_mining_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/api/mine/jobs/<job_id>', methods=['DELETE'])
+def cancel_mining_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+
+    cancelled = job_manager.cancel(job_id)
+    return jsonify({
+        'success': cancelled,
+        'message': 'Cancellation requested' if cancelled else f'Job already {job.status}',
+        'status': job.status
+    })
+
+
+@app.route('/api/mine/jobs/<job_id>/events', methods=['GET'])
+def stream_mining_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+
+    since = request.args.get('since', 0, type=int)
+
+    def generate():
+        index = since
+        while True:
+            events, index, finished = job.events_since(index, timeout=15)
+            for event in events:
+                yield json.dumps(event) + '\n'
+            if finished:
+                yield json.dumps({'event': 'status', 'status': job.status, 'error': job.error}) + '\n'
+                return
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
 
-        apriori_recs = apriori_miner.get_recommendations(item)
-        eclat_recs = eclat_miner.get_recommendations(item)
+def submit_mining_job(dataset: Dataset, plan: dict):
+    source, store = dataset.snapshot_store()
 
-        combined_recs = {}
-        for rec in apriori_recs + eclat_recs:
+    def run_job(job: Job) -> dict:
+        miners, response = mine_results(plan, store)
+        if job.cancel_requested.is_set():
+            raise JobCancelled(job.id)
+        response['dataset'] = dataset.name
+        response['installed'] = dataset.install(miners, store, source)
+        return response
+
+    try:
+        job = job_manager.submit(run_job)
+    except Full:
+        return jsonify({'success': False, 'message': 'Mining queue is full, try again later'}), 429
+
+    return jsonify({'success': True, 'job_id': job.id, 'dataset': dataset.name, 'status': job.status}), 202
+
+
+def fraction_arg(data: dict, name: str, default: float, allow_zero: bool = True) -> float:
+    value = float(data.get(name, default))
+    if not (0 <= value if allow_zero else 0 < value) or value > 1:
+        raise ValueError(f"{name} must be in {'[0, 1]' if allow_zero else '(0, 1]'}")
+    return value
+
+
+def jobs_arg(data: dict) -> int:
+    n_jobs = int(data.get('n_jobs', 1))
+    if n_jobs > max_jobs or resolve_n_jobs(n_jobs) > max_jobs:
+        raise ValueError(f'n_jobs must be at most {max_jobs}')
+    return n_jobs
+
+
+def mining_plan(data: dict) -> dict:
+    if data.get('top_k') is not None:
+        return top_k_plan(data)
+    if data.get('approximate'):
+        return approximate_plan(data)
+
+    min_support = fraction_arg(data, 'min_support', 0.2, allow_zero=False)
+    min_confidence = fraction_arg(data, 'min_confidence', 0.5)
+    tidlist = data.get('tidlist', 'set')
+    run_fpgrowth = bool(data.get('fpgrowth', False))
+    n_jobs = jobs_arg(data)
+    output = data.get('output', 'all')
+    floor_support = fraction_arg(data, 'floor_support', min_support, allow_zero=False)
+    floor_confidence = fraction_arg(data, 'floor_confidence', min_confidence)
+
+    miners = {
+        'apriori': AprioriMiner(min_support, min_confidence, n_jobs, output, mining_hooks),
+        'eclat': EclatMiner(min_support, min_confidence, tidlist, n_jobs, output, mining_hooks)
+    }
+    if run_fpgrowth:
+        miners['fpgrowth'] = FPGrowthMiner(min_support, min_confidence, output, mining_hooks)
+
+    floor_miners = []
+    if floor_support < min_support or floor_confidence < min_confidence:
+        floor_support = min(floor_support, min_support)
+        floor_confidence = min(floor_confidence, min_confidence)
+        floor_miners = [
+            AprioriMiner(floor_support, floor_confidence, n_jobs, output, mining_hooks),
+            EclatMiner(floor_support, floor_confidence, tidlist, n_jobs, output, mining_hooks)
+        ]
+        if run_fpgrowth:
+            floor_miners.append(FPGrowthMiner(floor_support, floor_confidence, output, mining_hooks))
+
+    return {
+        'message': 'Mining completed',
+        'miners': miners,
+        'floor_miners': floor_miners,
+        'cached': True,
+        'stats': bool(data.get('stats', False)),
+        'parameters': {
+            'min_support': min_support,
+            'min_confidence': min_confidence,
+            'tidlist': tidlist,
+            'fpgrowth': run_fpgrowth,
+            'n_jobs': n_jobs,
+            'output': output
+        }
+    }
+
+
+def top_k_plan(data: dict) -> dict:
+    top_k = int(data['top_k'])
+    metric = data.get('top_k_metric', 'confidence')
+    min_support = fraction_arg(data, 'min_support', 0.0)
+    tidlist = data.get('tidlist', 'bitset')
+
+    return {
+        'message': 'Top-K mining completed',
+        'miners': {'topk': TopKRuleMiner(top_k, metric, min_support, tidlist, mining_hooks,
+                                         topk_max_expansions)},
+        'cached': False,
+        'stats': bool(data.get('stats', False)),
+        'parameters': {
+            'top_k': top_k,
+            'top_k_metric': metric,
+            'min_support': min_support,
+            'tidlist': tidlist
+        }
+    }
+
+
+def approximate_plan(data: dict) -> dict:
+    min_support = fraction_arg(data, 'min_support', 0.2, allow_zero=False)
+    min_confidence = fraction_arg(data, 'min_confidence', 0.5)
+    tidlist = data.get('tidlist', 'set')
+    epsilon = float(data.get('epsilon', 0.01))
+    delta = float(data.get('delta', 0.05))
+    sample_size = data.get('sample_size')
+    sample_size = int(sample_size) if sample_size is not None else None
+    if sample_size is not None and sample_size < 1:
+        raise ValueError('sample_size must be at least 1')
+    verify = bool(data.get('verify', False))
+    seed = data.get('seed')
+
+    miners = {
+        'apriori': SampledMiner(AprioriMiner(min_support, min_confidence, hooks=mining_hooks),
+                                epsilon, delta, sample_size, verify, seed),
+        'eclat': SampledMiner(EclatMiner(min_support, min_confidence, tidlist, hooks=mining_hooks),
+                              epsilon, delta, sample_size, verify, seed)
+    }
+    n_sampled = sample_size or chernoff_sample_size(epsilon, delta)
+    if chernoff_margin(n_sampled, delta) >= min_support:
+        raise ValueError(f'A sample of {n_sampled} transactions is too small for '
+                         f'min_support={min_support}, increase sample_size or lower epsilon')
+
+    return {
+        'message': 'Approximate mining completed',
+        'miners': miners,
+        'cached': False,
+        'stats': bool(data.get('stats', False)),
+        'parameters': {
+            'min_support': min_support,
+            'min_confidence': min_confidence,
+            'tidlist': tidlist,
+            'epsilon': epsilon,
+            'delta': delta,
+            'sample_size': sample_size,
+            'verify': verify
+        }
+    }
+
+
+def mine_results(plan: dict, store: TransactionStore) -> tuple:
+    response = {
+        'success': True,
+        'message': plan['message'],
+        'parameters': plan['parameters']
+    }
+
+    miners = {}
+    if plan['cached']:
+        fingerprint = store.fingerprint()
+        for floor_miner in plan['floor_miners']:
+            mining_cache.fit(floor_miner, store, fingerprint)
+        for name, miner in plan['miners'].items():
+            miners[name], response[name] = mining_cache.fit(miner, store, fingerprint)
+    else:
+        for name, miner in plan['miners'].items():
+            miners[name] = miner
+            response[name] = miner.fit(store)
+
+    if plan['stats']:
+        for name, miner in miners.items():
+            response[name]['stats'] = miner.stats.to_dict()
+
+    return miners, response
+
+
+def merge_recommendations(rec_lists: list) -> list:
+    combined_recs = {}
+    for recs in rec_lists:
+        for rec in recs:
             rec_item = rec['item']
             if rec_item not in combined_recs:
                 combined_recs[rec_item] = {
@@ -201,68 +557,203 @@ def get_recommendations(item):
             combined_recs[rec_item]['support'].append(rec['support'])
             combined_recs[rec_item]['lift'].append(rec['lift'])
 
-        final_recs = []
-        for rec_item, data in combined_recs.items():
-            final_recs.append({
-                'item': rec_item,
-                'confidence': sum(data['confidence']) / len(data['confidence']),
-                'support': sum(data['support']) / len(data['support']),
-                'lift': sum(data['lift']) / len(data['lift'])
-            })
+    final_recs = []
+    for rec_item, data in combined_recs.items():
+        final_recs.append({
+            'item': rec_item,
+            'confidence': sum(data['confidence']) / len(data['confidence']),
+            'support': sum(data['support']) / len(data['support']),
+            'lift': sum(data['lift']) / len(data['lift'])
+        })
 
-        final_recs.sort(key=lambda x: x['confidence'], reverse=True)
+    final_recs.sort(key=lambda x: x['confidence'], reverse=True)
+    return final_recs[:10]
+
+
+@app.route('/api/recommendations/<item>', methods=['GET'])
+def get_recommendations(item):
+    snapshot = current_dataset().snapshot
+    if not snapshot:
+        return jsonify({'success': False, 'message': 'Please run mining first'}), 400
+
+    try:
+        item = item.lower()
+
+        final_recs = snapshot.recommendations.get(item)
+        if final_recs is None:
+            final_recs = merge_recommendations(
+                [miner.get_recommendations(item) for miner in snapshot.miners.values()]
+            )
+            snapshot.recommendations[item] = final_recs
 
         return jsonify({
             'success': True,
             'item': item,
-            'recommendations': final_recs[:10]
+            'recommendations': final_recs
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error getting recommendations: {str(e)}'}), 500
 
 
+@app.route('/api/recommendations', methods=['POST'])
+def get_basket_recommendations():
+    snapshot = current_dataset().snapshot
+    if not snapshot:
+        return jsonify({'success': False, 'message': 'Please run mining first'}), 400
+
+    data = request.json
+    basket = [item.strip().lower() for item in data.get('items', [])]
+    if not basket:
+        return jsonify({'success': False, 'message': 'No items provided'}), 400
+
+    try:
+        final_recs = merge_recommendations([miner.recommend(basket) for miner in snapshot.miners.values()])
+
+        return jsonify({
+            'success': True,
+            'items': basket,
+            'recommendations': final_recs
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error getting recommendations: {str(e)}'}), 500
+
+
+def rule_query_args() -> dict:
+    sort = request.args.get('sort', 'confidence')
+    if sort not in RULE_METRICS:
+        raise ValueError(f"sort must be one of {', '.join(RULE_METRICS)}")
+
+    item = request.args.get('item')
+    return {
+        'item': item.strip().lower() if item else None,
+        'min_support': request.args.get('min_support', 0.0, type=float),
+        'min_confidence': request.args.get('min_confidence', 0.0, type=float),
+        'min_lift': request.args.get('min_lift', 0.0, type=float),
+        'sort': sort,
+        'descending': request.args.get('order', 'desc') != 'asc'
+    }
+
+
+def selected_miners(snapshot: Snapshot) -> list:
+    algorithm = request.args.get('algorithm')
+    if algorithm is None:
+        return list(snapshot.miners)
+    if algorithm not in snapshot.miners:
+        raise ValueError(f"No mined results for '{algorithm}'")
+    return [algorithm]
+
+
 @app.route('/api/rules', methods=['GET'])
 def get_rules():
-    if not apriori_miner or not eclat_miner:
+    snapshot = current_dataset().snapshot
+    if not snapshot:
+        return jsonify({'success': False, 'message': 'Please run mining first'}), 400
+
+    try:
+        query = rule_query_args()
+        names = selected_miners(snapshot)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        offset, limit = page_args()
+        body = [json.dumps({'success': True, 'offset': offset, 'limit': limit})[:-1]]
+        for name in names:
+            catalog = snapshot.catalog(name)
+            rule_ids = catalog.query(**query)
+            body.append(f', "{name}_total": {len(rule_ids)}')
+            body.append(f', "{name}_rules": {catalog.to_json(rule_ids[offset:offset + limit])}')
+        body.append('}')
+
+        return Response(''.join(body), mimetype='application/json')
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error getting rules: {str(e)}'}), 500
+
+
+@app.route('/api/rules/export', methods=['GET'])
+def export_rules():
+    snapshot = current_dataset().snapshot
+    if not snapshot:
         return jsonify({'success': False, 'message': 'Please run mining first'}), 400
 
     try:
-        apriori_rules = apriori_miner.get_rules()
-        eclat_rules = eclat_miner.get_rules()
-
-        def serialize_rule(rule):
-            return {
-                'antecedent': list(rule['antecedent']),
-                'consequent': list(rule['consequent']),
-                'support': rule['support'],
-                'confidence': rule['confidence'],
-                'lift': rule['lift']
-            }
+        query = rule_query_args()
+        names = selected_miners(snapshot)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    if len(names) != 1:
+        return jsonify({'success': False, 'message': 'Pass algorithm to choose the rules to export'}), 400
+
+    catalog = snapshot.catalog(names[0])
+    return Response(catalog.iter_ndjson(catalog.query(**query)), mimetype='application/x-ndjson')
+
 
+@app.route('/api/model/save', methods=['POST'])
+def save_mined_model():
+    dataset = current_dataset()
+    miners = dataset.snapshot.updatable()
+    if not miners:
+        return jsonify({'success': False, 'message': 'Please run mining first'}), 400
+
+    data = request.json or {}
+    algorithm = data.get('algorithm', next(iter(miners)))
+    if algorithm not in miners:
+        return jsonify({'success': False, 'message': f"No mined results for '{algorithm}'"}), 400
+
+    path = dataset_model_path(dataset.name)
+    try:
+        save_model(miners[algorithm], path, algorithm)
         return jsonify({
             'success': True,
-            'apriori_rules': [serialize_rule(r) for r in apriori_rules],
-            'eclat_rules': [serialize_rule(r) for r in eclat_rules]
+            'message': f'Saved {algorithm} model',
+            'dataset': dataset.name,
+            'path': path,
+            'size': os.path.getsize(path)
         })
     except Exception as e:
-        return jsonify({'success': False, 'message': f'Error getting rules: {str(e)}'}), 500
+        return jsonify({'success': False, 'message': f'Error saving model: {str(e)}'}), 500
+
+
+@app.route('/api/model/load', methods=['POST'])
+def load_mined_model():
+    dataset = current_dataset(create=True)
+    model = load_model(dataset)
+    if model is None:
+        return jsonify({'success': False,
+                        'message': f'No valid model at {dataset_model_path(dataset.name)}'}), 404
+
+    return jsonify({
+        'success': True,
+        'message': f'Loaded {model.algorithm} model',
+        'dataset': dataset.name,
+        'num_rules': model.n_rules,
+        'num_items': len(model.items)
+    })
 
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    unique_items = set()
-    for transaction in cleaned_transactions:
-        unique_items.update(transaction)
+    return jsonify(current_dataset().to_dict())
+
 
+@app.route('/api/datasets', methods=['GET'])
+def list_datasets():
     return jsonify({
-        'total_raw_transactions': len(transactions_data),
-        'total_cleaned_transactions': len(cleaned_transactions),
-        'unique_items': len(unique_items),
-        'preprocessing_done': len(cleaned_transactions) > 0,
-        'mining_done': apriori_miner is not None and eclat_miner is not None
+        'success': True,
+        'datasets': [dataset.to_dict() for dataset in datasets.values()]
     })
 
 
+@app.route('/api/datasets/<name>', methods=['DELETE'])
+def delete_dataset(name):
+    if name == DEFAULT_DATASET:
+        return jsonify({'success': False, 'message': 'The default dataset cannot be removed'}), 400
+
+    datasets.remove(name)
+    return jsonify({'success': True, 'message': f"Removed dataset '{name}'"})
+
+
 if __name__ == '__main__':
     os.makedirs('data', exist_ok=True)
     app.run(debug=True, port=5001)
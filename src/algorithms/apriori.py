@@ -1,26 +1,56 @@
 import time
-from itertools import combinations
-from typing import List, Dict, Set, Tuple
-from collections import defaultdict
+from typing import List, Dict, Set, Tuple, Union, Optional
+
+from src.algorithms.candidate_trie import CandidateTrie, generate_candidates
+from src.algorithms.closed import OUTPUT_MODES, compact_itemsets, filter_closed
+from src.algorithms.incremental import touched_items, update_frequent_itemsets
+from src.algorithms.instrumentation import Hook, MiningStats
+from src.algorithms.parallel import partition_pool, resolve_n_jobs
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.rules import generate_rules, update_rules
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.transactions import TransactionStore, as_store
 
 
 class AprioriMiner:
 
-    def __init__(self, min_support: float = 0.2, min_confidence: float = 0.5):
+    def __init__(self, min_support: float = 0.2, min_confidence: float = 0.5, n_jobs: int = 1,
+                 output: str = 'all',
+                 hooks: Optional[List[Hook]] = None):
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output}', expected one of {OUTPUT_MODES}")
+
         self.min_support = min_support
         self.min_confidence = min_confidence
-        self.transactions = []
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.output = output
+        self.transactions = TransactionStore()
+        self.support_index = SupportIndex()
+        self.n_mined = 0
+        self.stats = MiningStats(hooks)
         self.frequent_itemsets = {}
-        self.rules = []
+        self.rules = RuleSet()
+        self.recommendation_index = RecommendationIndex(self.rules)
         self.execution_time = 0
 
-    def fit(self, transactions: List[List[str]]) -> Dict:
+    def fit(self, transactions: Union[List[List[str]], TransactionStore]) -> Dict:
         start_time = time.time()
-        self.transactions = transactions
-        n_transactions = len(transactions)
+        self.stats = self.stats.fresh()
+        self.transactions = as_store(transactions)
+        n_transactions = len(self.transactions)
+        self.n_mined = n_transactions
+        self.support_index = SupportIndex(n_transactions)
 
         self.frequent_itemsets = self._find_frequent_itemsets(n_transactions)
+        if self.output != 'all':
+            with self.stats.phase('compact'):
+                self.frequent_itemsets, self.support_index = compact_itemsets(
+                    filter_closed(self.support_index.counts), self.output, n_transactions
+                )
         self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
 
         self.execution_time = (time.time() - start_time) * 1000
 
@@ -30,135 +60,126 @@ class AprioriMiner:
             'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
         }
 
-    def _find_frequent_itemsets(self, n_transactions: int) -> Dict:
-        frequent_itemsets = {}
-        min_support_count = self.min_support * n_transactions
-
-        item_counts = defaultdict(int)
-        for transaction in self.transactions:
-            for item in transaction:
-                item_counts[frozenset([item])] += 1
-
-        frequent_itemsets[1] = {
-            itemset: count / n_transactions
-            for itemset, count in item_counts.items()
-            if count >= min_support_count
-        }
-
-        k = 2
-        while frequent_itemsets.get(k - 1):
-            candidates = self._generate_candidates(frequent_itemsets[k - 1], k)
-
-            candidate_counts = defaultdict(int)
-            for transaction in self.transactions:
-                transaction_set = set(transaction)
-                for candidate in candidates:
-                    if candidate.issubset(transaction_set):
-                        candidate_counts[frozenset(candidate)] += 1
-
-            frequent_k = {
-                itemset: count / n_transactions
-                for itemset, count in candidate_counts.items()
-                if count >= min_support_count
-            }
-
-            if frequent_k:
-                frequent_itemsets[k] = frequent_k
-                k += 1
-            else:
-                break
-
-        return frequent_itemsets
-
-    def _generate_candidates(self, prev_frequent: Dict, k: int) -> Set[frozenset]:
-        items = set()
-        for itemset in prev_frequent.keys():
-            items.update(itemset)
-
-        candidates = set()
-        for candidate in combinations(sorted(items), k):
-            candidate_set = frozenset(candidate)
+    @property
+    def incremental(self) -> bool:
+        return self.output == 'all'
 
-            is_valid = True
-            for subset in combinations(candidate, k - 1):
-                if frozenset(subset) not in prev_frequent:
-                    is_valid = False
-                    break
+    def update(self, transactions: Optional[List[List[str]]] = None) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        if transactions is not None:
+            self.transactions.extend(transactions)
 
-            if is_valid:
-                candidates.add(candidate_set)
+        if self.output != 'all':
+            return self.fit(self.transactions)
 
-        return candidates
+        touched = touched_items(self.transactions, self.n_mined)
+        with self.stats.phase('incremental_count'):
+            self.frequent_itemsets = update_frequent_itemsets(self.transactions, self.n_mined,
+                                                              self.support_index, self.min_support,
+                                                              self.stats)
+        self.n_mined = len(self.transactions)
+        self._update_rules(touched)
 
-    def _generate_rules(self) -> List[Dict]:
-        rules = []
+        self.execution_time = (time.time() - start_time) * 1000
 
-        for k in range(2, len(self.frequent_itemsets) + 1):
-            if k not in self.frequent_itemsets:
-                continue
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
 
-            for itemset, support in self.frequent_itemsets[k].items():
-                items = list(itemset)
+    def set_min_confidence(self, min_confidence: float) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        self.min_confidence = min_confidence
+        self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
 
-                for i in range(1, len(items)):
-                    for antecedent in combinations(items, i):
-                        antecedent = frozenset(antecedent)
-                        consequent = itemset - antecedent
+        self.execution_time = (time.time() - start_time) * 1000
 
-                        if not consequent:
-                            continue
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
 
-                        antecedent_support = self._get_support(antecedent)
-                        if antecedent_support == 0:
-                            continue
+    def _find_frequent_itemsets(self, n_transactions: int) -> Dict:
+        frequent_itemsets = {}
+        min_support_count = self.min_support * n_transactions
 
-                        confidence = support / antecedent_support
+        frequent_itemsets[1] = {}
+        with self.stats.phase('count_items'):
+            for item_id, count in enumerate(self.transactions.item_counts()):
+                if count and count >= min_support_count:
+                    frequent_itemsets[1][(item_id,)] = count / n_transactions
+                    self.support_index.add((item_id,), count)
+        self.stats.add(1, 'candidates', self.transactions.n_items)
+        self.stats.add(1, 'frequent', len(frequent_itemsets[1]))
+        self.stats.end_level(1)
+
+        with partition_pool(self.n_jobs, self.transactions) as pool:
+            k = 2
+            while frequent_itemsets.get(k - 1):
+                with self.stats.phase('generate_candidates'):
+                    candidates = CandidateTrie(self._generate_candidates(frequent_itemsets[k - 1], k), k)
+
+                with self.stats.phase('count_candidates'):
+                    if pool is not None:
+                        pool.count(candidates)
+                    else:
+                        candidates.count_transactions(self.transactions)
+
+                frequent_k = {}
+                for itemset, count in candidates.frequent(min_support_count).items():
+                    frequent_k[itemset] = count / n_transactions
+                    self.support_index.add(itemset, count)
+
+                self.stats.add(k, 'candidates', len(candidates))
+                self.stats.add(k, 'frequent', len(frequent_k))
+                self.stats.end_level(k)
+
+                if frequent_k:
+                    frequent_itemsets[k] = frequent_k
+                    k += 1
+                else:
+                    break
 
-                        if confidence >= self.min_confidence:
-                            consequent_support = self._get_support(consequent)
-                            lift = confidence / consequent_support if consequent_support > 0 else 0
+        return frequent_itemsets
 
-                            rules.append({
-                                'antecedent': set(antecedent),
-                                'consequent': set(consequent),
-                                'support': support,
-                                'confidence': confidence,
-                                'lift': lift
-                            })
+    def _generate_candidates(self, prev_frequent: Dict, k: int) -> Set[Tuple[int, ...]]:
+        return generate_candidates(prev_frequent, k, self.stats)
 
+    def _generate_rules(self) -> RuleSet:
+        with self.stats.phase('generate_rules'):
+            rules = generate_rules(self.frequent_itemsets, self.support_index,
+                                   self.min_confidence, self.transactions.items)
+        self.stats.count('rules', len(rules))
         return rules
 
-    def _get_support(self, itemset: frozenset) -> float:
-        k = len(itemset)
-        if k in self.frequent_itemsets and itemset in self.frequent_itemsets[k]:
-            return self.frequent_itemsets[k][itemset]
-
-        count = sum(1 for transaction in self.transactions if itemset.issubset(set(transaction)))
-        return count / len(self.transactions) if self.transactions else 0
+    def _update_rules(self, touched: Set[int]):
+        with self.stats.phase('generate_rules'):
+            rules, kept, dirty = update_rules(self.rules, self.frequent_itemsets, self.support_index,
+                                              self.min_confidence, self.transactions.items, touched)
+        self.stats.count('rules', len(rules))
+        self.stats.count('dirty_items', len(dirty))
+        self.rules = rules
+        with self.stats.phase('build_index'):
+            self.recommendation_index = self.recommendation_index.updated(rules, kept, dirty)
+
+    def get_frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        decode = self.transactions.decode
+        return {
+            k: {decode(itemset): support for itemset, support in itemsets.items()}
+            for k, itemsets in self.frequent_itemsets.items()
+        }
 
     def get_rules(self) -> List[Dict]:
-        return self.rules
-
-    def get_recommendations(self, item: str) -> List[Dict]:
-        recommendations = []
-
-        for rule in self.rules:
-            if item in rule['antecedent']:
-                for rec_item in rule['consequent']:
-                    recommendations.append({
-                        'item': rec_item,
-                        'confidence': rule['confidence'],
-                        'support': rule['support'],
-                        'lift': rule['lift']
-                    })
-
-        recommendations.sort(key=lambda x: x['confidence'], reverse=True)
-
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            if rec['item'] not in seen:
-                seen.add(rec['item'])
-                unique_recommendations.append(rec)
-
-        return unique_recommendations
+        return list(self.rules)
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.get(item, top_n)
+
+    def recommend(self, basket: List[str], top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.recommend(basket, top_n)
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from typing import Collection, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.algorithms.instrumentation import MiningStats
+
+
+class CandidateTrie:
+
+    def __init__(self, candidates: Iterable[Tuple[int, ...]], k: int):
+        self.k = k
+        self.candidates: List[Tuple[int, ...]] = sorted(candidates)
+        self.counts = [0] * len(self.candidates)
+        self.items = set()
+        self.root = {}
+
+        for index, candidate in enumerate(self.candidates):
+            node = self.root
+            for item in candidate[:-1]:
+                node = node.setdefault(item, {})
+            node[candidate[-1]] = index
+            self.items.update(candidate)
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def count_transaction(self, transaction: Sequence[int]):
+        items = [item for item in transaction if item in self.items]
+        if len(items) >= self.k:
+            self._walk(self.root, items, 0, self.k)
+
+    def count_transactions(self, transactions: Iterable[Sequence[int]]):
+        for transaction in transactions:
+            self.count_transaction(transaction)
+
+    def _walk(self, node: Dict, items: List[int], start: int, depth: int):
+        if depth == 1:
+            counts = self.counts
+            for position in range(start, len(items)):
+                index = node.get(items[position])
+                if index is not None:
+                    counts[index] += 1
+            return
+
+        for position in range(start, len(items) - depth + 1):
+            child = node.get(items[position])
+            if child is not None:
+                self._walk(child, items, position + 1, depth - 1)
+
+    def frequent(self, min_support_count: float) -> Dict[Tuple[int, ...], int]:
+        return {
+            candidate: count
+            for candidate, count in zip(self.candidates, self.counts)
+            if count and count >= min_support_count
+        }
+
+
+def generate_candidates(prev_frequent: Collection[Tuple[int, ...]], k: int,
+                        stats: Optional[MiningStats] = None) -> Set[Tuple[int, ...]]:
+    prefix_groups = defaultdict(list)
+    for itemset in prev_frequent:
+        prefix_groups[itemset[:-1]].append(itemset[-1])
+
+    candidates = set()
+    pruned = 0
+    for prefix, last_items in prefix_groups.items():
+        last_items.sort()
+
+        for i in range(len(last_items)):
+            for j in range(i + 1, len(last_items)):
+                candidate = prefix + (last_items[i], last_items[j])
+
+                is_valid = True
+                for drop in range(k - 2):
+                    if candidate[:drop] + candidate[drop + 1:] not in prev_frequent:
+                        is_valid = False
+                        break
+
+                if is_valid:
+                    candidates.add(candidate)
+                else:
+                    pruned += 1
+
+    if stats is not None and pruned:
+        stats.add(k, 'pruned', pruned)
+
+    return candidates
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from src.algorithms.support_index import SupportIndex
+
+OUTPUT_MODES = ('all', 'closed', 'maximal')
+
+
+def _has_superset(itemset: Tuple[int, ...], postings: Dict[int, List[int]],
+                  itemsets: List[Tuple[int, ...]]) -> bool:
+    lists = sorted((postings[item] for item in itemset), key=len)
+    if len(lists[0]) <= 1:
+        return False
+
+    candidates = set(lists[0])
+    for posting in lists[1:]:
+        candidates.intersection_update(posting)
+        if len(candidates) <= 1:
+            return False
+
+    return any(len(itemsets[index]) > len(itemset) for index in candidates)
+
+
+def _postings(itemsets: Iterable[Tuple[int, ...]]) -> Dict[int, List[int]]:
+    postings = defaultdict(list)
+    for index, itemset in enumerate(itemsets):
+        for item in itemset:
+            postings[item].append(index)
+    return postings
+
+
+def filter_closed(counts: Dict[Tuple[int, ...], int]) -> Dict[Tuple[int, ...], int]:
+    by_count = defaultdict(list)
+    for itemset, count in counts.items():
+        by_count[count].append(itemset)
+
+    closed = {}
+    for count, itemsets in by_count.items():
+        postings = _postings(itemsets)
+        for itemset in itemsets:
+            if not _has_superset(itemset, postings, itemsets):
+                closed[itemset] = count
+
+    return {itemset: count for itemset, count in counts.items() if itemset in closed}
+
+
+def filter_maximal(counts: Dict[Tuple[int, ...], int]) -> Dict[Tuple[int, ...], int]:
+    itemsets = list(counts)
+    postings = _postings(itemsets)
+    return {
+        itemset: counts[itemset]
+        for itemset in itemsets
+        if not _has_superset(itemset, postings, itemsets)
+    }
+
+
+class ClosedSupportIndex(SupportIndex):
+
+    def __init__(self, n_transactions: int = 0):
+        super().__init__(n_transactions)
+        self.closed_by_item = defaultdict(list)
+        self.closed_itemsets: List[Tuple[int, ...]] = []
+        self.derived_counts: Dict[Tuple[int, ...], int] = {}
+
+    def __contains__(self, itemset: Tuple[int, ...]) -> bool:
+        try:
+            self.count(itemset)
+        except KeyError:
+            return False
+        return True
+
+    def add(self, itemset: Tuple[int, ...], count: int):
+        if itemset not in self.counts:
+            for item in itemset:
+                self.closed_by_item[item].append(len(self.closed_itemsets))
+            self.closed_itemsets.append(itemset)
+        self.counts[itemset] = count
+        self.derived_counts.clear()
+
+    def count(self, itemset: Tuple[int, ...]) -> int:
+        count = self.counts.get(itemset)
+        if count is None:
+            count = self.derived_counts.get(itemset)
+        if count is None:
+            count = self._closure_count(itemset)
+            self.derived_counts[itemset] = count
+        return count
+
+    def support(self, itemset: Tuple[int, ...]) -> float:
+        return self.count(itemset) / self.n_transactions
+
+    def _closure_count(self, itemset: Tuple[int, ...]) -> int:
+        lists = sorted((self.closed_by_item.get(item, ()) for item in itemset), key=len)
+        if not lists or not lists[0]:
+            raise KeyError(itemset)
+
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+
+        if not candidates:
+            raise KeyError(itemset)
+
+        return max(self.counts[self.closed_itemsets[index]] for index in candidates)
+
+
+def compact_itemsets(closed_counts: Dict[Tuple[int, ...], int], output: str,
+                     n_transactions: int) -> Tuple[Dict[int, Dict[Tuple[int, ...], float]], ClosedSupportIndex]:
+    support_index = ClosedSupportIndex(n_transactions)
+    for itemset, count in closed_counts.items():
+        support_index.add(itemset, count)
+
+    selected = filter_maximal(closed_counts) if output == 'maximal' else closed_counts
+
+    frequent_itemsets = {1: {}}
+    for itemset, count in selected.items():
+        k = len(itemset)
+        if k not in frequent_itemsets:
+            frequent_itemsets[k] = {}
+        frequent_itemsets[k][itemset] = count / n_transactions
+
+    return dict(sorted(frequent_itemsets.items())), support_index
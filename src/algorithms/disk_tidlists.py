@@ -0,0 +1,299 @@
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.algorithms.tidlists import Tidlist
+from src.algorithms.transactions import TransactionStore
+
+MAGIC = b'DMTIDS01'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+SET_ENTRY_BYTES = 36
+
+
+def _append_varint(buffer: bytearray, value: int):
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _decode_tids(data: bytes) -> List[int]:
+    tids = []
+    tid = -1
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            tid += value
+            tids.append(tid)
+            value = 0
+            shift = 0
+    return tids
+
+
+class TidlistWriter:
+
+    def __init__(self, filepath: str, memory_limit: int = 64 << 20,
+                 base: Optional['DiskTidlists'] = None):
+        self.filepath = filepath
+        self.memory_limit = memory_limit
+        self.base = base
+        self.items: List[str] = list(base.items) if base else []
+        self.item_ids: Dict[str, int] = dict(base.item_ids) if base else {}
+        self.counts: List[int] = list(base.counts) if base else []
+        self.last: List[int] = list(base.last) if base else []
+        self.n_transactions = base.n_transactions if base else 0
+        self.buffers: Dict[int, bytearray] = {}
+        self.buffered = 0
+        self.chunks: List[List[Tuple[int, int]]] = [[] for _ in self.items]
+        self.spill = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(filepath)))
+
+    def intern(self, item: str) -> int:
+        item_id = self.item_ids.get(item)
+        if item_id is None:
+            item_id = len(self.items)
+            self.item_ids[item] = item_id
+            self.items.append(item)
+            self.counts.append(0)
+            self.last.append(-1)
+            self.chunks.append([])
+        return item_id
+
+    def append(self, transaction: Iterable[str]):
+        tid = self.n_transactions
+        for item in set(transaction):
+            item_id = self.intern(item)
+            buffer = self.buffers.get(item_id)
+            if buffer is None:
+                buffer = self.buffers[item_id] = bytearray()
+            size = len(buffer)
+            _append_varint(buffer, tid - self.last[item_id])
+            self.buffered += len(buffer) - size
+            self.last[item_id] = tid
+            self.counts[item_id] += 1
+
+        self.n_transactions += 1
+        if self.buffered >= self.memory_limit:
+            self._flush()
+
+    def extend(self, transactions: Iterable[Iterable[str]]):
+        for transaction in transactions:
+            self.append(transaction)
+
+    def _flush(self):
+        for item_id, buffer in self.buffers.items():
+            self.chunks[item_id].append((self.spill.tell(), len(buffer)))
+            self.spill.write(buffer)
+        self.buffers = {}
+        self.buffered = 0
+
+    def close(self):
+        self._flush()
+        sizes = [sum(length for _, length in chunks) for chunks in self.chunks]
+        if self.base is not None:
+            for item_id in range(self.base.n_items):
+                sizes[item_id] += self.base.offsets[item_id + 1] - self.base.offsets[item_id]
+
+        offsets = array('q', [0])
+        for size in sizes:
+            offsets.append(offsets[-1] + size)
+
+        sections = {
+            'counts': array('q', self.counts),
+            'last': array('q', self.last),
+            'offsets': offsets
+        }
+        layout = {}
+        position = 0
+        for name, values in sections.items():
+            layout[name] = (values.typecode, position, len(values) * values.itemsize)
+            position = -(-(position + len(values) * values.itemsize) // ALIGNMENT) * ALIGNMENT
+        layout['data'] = ('B', position, offsets[-1])
+
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'n_transactions': self.n_transactions,
+            'items': self.items,
+            'sections': layout
+        }).encode('utf-8')
+        data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        tmp_path = f'{self.filepath}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for name, values in sections.items():
+                f.write(b'\0' * (data_start + layout[name][1] - f.tell()))
+                f.write(values.tobytes())
+            f.write(b'\0' * (data_start + layout['data'][1] - f.tell()))
+
+            for item_id, chunks in enumerate(self.chunks):
+                if self.base is not None and item_id < self.base.n_items:
+                    f.write(self.base.raw(item_id))
+                for position, length in chunks:
+                    self.spill.seek(position)
+                    f.write(self.spill.read(length))
+        os.replace(tmp_path, self.filepath)
+        self.spill.close()
+
+
+class DiskTidlists:
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{filepath} is not a tidlist file')
+
+        header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+        if header['version'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f'{filepath} was written by an incompatible version or platform')
+
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+        buffer = memoryview(self._mmap)
+        self._views = [buffer]
+        for name, (typecode, offset, length) in header['sections'].items():
+            start = data_start + offset
+            view = buffer[start:start + length].cast(typecode)
+            self._views.append(view)
+            setattr(self, name, view)
+
+        self.n_transactions = header['n_transactions']
+        self.items: List[str] = header['items']
+        self.item_ids = {item: item_id for item_id, item in enumerate(self.items)}
+
+    @classmethod
+    def build(cls, transactions: Iterable[Iterable[str]], filepath: str,
+              memory_limit: int = 64 << 20) -> 'DiskTidlists':
+        writer = TidlistWriter(filepath, memory_limit)
+        if isinstance(transactions, TransactionStore):
+            items = transactions.items
+            for item in items:
+                writer.intern(item)
+            transactions = ([items[item_id] for item_id in transaction] for transaction in transactions)
+        writer.extend(transactions)
+        writer.close()
+        return cls(filepath)
+
+    def __getstate__(self) -> Dict:
+        return {'filepath': self.filepath}
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state['filepath'])
+
+    def __len__(self) -> int:
+        return self.n_transactions
+
+    @property
+    def n_items(self) -> int:
+        return len(self.items)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def extend(self, transactions: Iterable[Iterable[str]], memory_limit: int = 64 << 20) -> 'DiskTidlists':
+        writer = TidlistWriter(self.filepath, memory_limit, base=self)
+        writer.extend(transactions)
+        writer.close()
+        self.close()
+        return DiskTidlists(self.filepath)
+
+    def raw(self, item_id: int) -> bytes:
+        return bytes(self.data[self.offsets[item_id]:self.offsets[item_id + 1]])
+
+    def tids(self, item_id: int) -> List[int]:
+        return _decode_tids(self.data[self.offsets[item_id]:self.offsets[item_id + 1]])
+
+    def load(self, item_id: int, bitsets: bool) -> Tidlist:
+        if not bitsets:
+            return set(self.tids(item_id))
+
+        buffer = bytearray((self.n_transactions + 7) // 8)
+        for tid in self.tids(item_id):
+            buffer[tid >> 3] |= 1 << (tid & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def vocabulary(self) -> TransactionStore:
+        store = TransactionStore()
+        store.items = list(self.items)
+        store.item_ids = dict(self.item_ids)
+        return store
+
+
+class TidlistPool:
+
+    def __init__(self, tidlists: DiskTidlists, capacity: int, bitsets: bool):
+        self.tidlists = tidlists
+        self.capacity = capacity
+        self.bitsets = bitsets
+        self.entries: Dict[int, Tuple[Tidlist, int]] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['entries'] = {}
+        state['size'] = 0
+        return state
+
+    def _nbytes(self, item_id: int) -> int:
+        if self.bitsets:
+            return (self.tidlists.n_transactions + 7) // 8
+        return self.tidlists.counts[item_id] * SET_ENTRY_BYTES
+
+    def get(self, position: int, item_id: int) -> Tidlist:
+        entry = self.entries.get(position)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        tidlist = self.tidlists.load(item_id, self.bitsets)
+        nbytes = self._nbytes(item_id)
+
+        while self.entries and self.size + nbytes > self.capacity:
+            coldest = min(self.entries)
+            if coldest > position:
+                return tidlist
+            self.size -= self.entries.pop(coldest)[1]
+
+        if nbytes <= self.capacity:
+            self.entries[position] = (tidlist, nbytes)
+            self.size += nbytes
+        return tidlist
+
+
+class PooledItems(Sequence):
+
+    def __init__(self, item_ids: List[int], counts: List[int], pool: TidlistPool):
+        self.item_ids = item_ids
+        self.counts = counts
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __getitem__(self, position: int) -> Tuple[Tuple[int, ...], Tidlist, int]:
+        item_id = self.item_ids[position]
+        return (item_id,), self.pool.get(position, item_id), self.counts[position]
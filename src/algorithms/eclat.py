@@ -1,29 +1,80 @@
 import time
-from typing import List, Dict, Set, Tuple
-from collections import defaultdict
-from itertools import combinations
+from typing import Iterable, List, Dict, Set, Tuple, Union, Optional
+
+from src.algorithms.closed import OUTPUT_MODES, compact_itemsets, filter_closed
+from src.algorithms.disk_tidlists import DiskTidlists, PooledItems, TidlistPool
+from src.algorithms.incremental import touched_items, update_frequent_itemsets
+from src.algorithms.instrumentation import Hook, MiningStats
+from src.algorithms.parallel import mine_eclat_classes, resolve_n_jobs
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.rules import generate_rules, update_rules
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.tidlists import (
+    TIDLIST_MODES, Tidlist, append_tidlists, build_bitsets, build_tidsets, tidlist_count,
+    tidlist_difference, tidlist_issubset
+)
+from src.algorithms.transactions import TransactionStore, as_store
 
 
 class EclatMiner:
 
-    def __init__(self, min_support: float = 0.2, min_confidence: float = 0.5):
+    def __init__(self, min_support: float = 0.2, min_confidence: float = 0.5, tidlist: str = 'set',
+                 n_jobs: int = 1, output: str = 'all',
+                 hooks: Optional[List[Hook]] = None,
+                 storage_path: Optional[str] = None, buffer_size: int = 256 << 20):
+        if tidlist not in TIDLIST_MODES:
+            raise ValueError(f"Unknown tidlist mode '{tidlist}', expected one of {TIDLIST_MODES}")
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output}', expected one of {OUTPUT_MODES}")
+        if storage_path is not None and output != 'all':
+            raise ValueError("Disk-backed tidlists only support output='all'")
+
         self.min_support = min_support
         self.min_confidence = min_confidence
-        self.transactions = []
-        self.tid_sets = {}
+        self.tidlist = tidlist
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.output = output
+        self.storage_path = storage_path
+        self.buffer_size = buffer_size
+        self.transactions = TransactionStore()
+        self.tid_sets = []
+        self.disk_tidlists: Optional[DiskTidlists] = None
+        self.support_index = SupportIndex()
+        self.n_mined = 0
+        self.stats = MiningStats(hooks)
         self.frequent_itemsets = {}
-        self.rules = []
+        self.rules = RuleSet()
+        self.recommendation_index = RecommendationIndex(self.rules)
         self.execution_time = 0
 
-    def fit(self, transactions: List[List[str]]) -> Dict:
+    def fit(self, transactions: Union[Iterable[List[str]], TransactionStore, DiskTidlists]) -> Dict:
         start_time = time.time()
-        self.transactions = transactions
-        n_transactions = len(transactions)
+        self.stats = self.stats.fresh()
+        if self.storage_path is None:
+            self.transactions = as_store(transactions)
+            with self.stats.phase('build_tidlists'):
+                self._build_tid_sets()
+            n_transactions = len(self.transactions)
+        else:
+            with self.stats.phase('build_tidlists'):
+                self._build_disk_tidlists(transactions)
+            n_transactions = len(self.disk_tidlists)
+        self.n_mined = n_transactions
         min_support_count = self.min_support * n_transactions
-
-        self._build_tid_sets()
-        self.frequent_itemsets = self._find_frequent_itemsets(min_support_count, n_transactions)
+        self.support_index = SupportIndex(n_transactions)
+
+        if self.output == 'all':
+            self.frequent_itemsets = self._find_frequent_itemsets(min_support_count, n_transactions)
+        else:
+            closed_counts = self._find_closed_itemsets(min_support_count)
+            with self.stats.phase('compact'):
+                self.frequent_itemsets, self.support_index = compact_itemsets(
+                    closed_counts, self.output, n_transactions
+                )
         self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
 
         self.execution_time = (time.time() - start_time) * 1000
 
@@ -33,34 +84,123 @@ class EclatMiner:
             'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
         }
 
-    def _build_tid_sets(self):
-        self.tid_sets = defaultdict(set)
+    @property
+    def incremental(self) -> bool:
+        return self.output == 'all' and self.storage_path is None
+
+    def update(self, transactions: Optional[List[List[str]]] = None) -> Dict:
+        if self.storage_path is not None:
+            if transactions is not None:
+                self.disk_tidlists = self.disk_tidlists.extend(transactions, self.buffer_size)
+            return self.fit(self.disk_tidlists)
 
-        for tid, transaction in enumerate(self.transactions):
-            for item in transaction:
-                self.tid_sets[item].add(tid)
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        if transactions is not None:
+            self.transactions.extend(transactions)
+
+        if self.output != 'all':
+            return self.fit(self.transactions)
+
+        touched = touched_items(self.transactions, self.n_mined)
+        with self.stats.phase('build_tidlists'):
+            append_tidlists(self.tid_sets, self.transactions, self.n_mined, self.tidlist != 'set')
+        with self.stats.phase('incremental_count'):
+            self.frequent_itemsets = update_frequent_itemsets(self.transactions, self.n_mined,
+                                                              self.support_index, self.min_support,
+                                                              self.stats)
+        self.n_mined = len(self.transactions)
+        self._update_rules(touched)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
+
+    def set_min_confidence(self, min_confidence: float) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        self.min_confidence = min_confidence
+        self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
 
-    def _find_frequent_itemsets(self, min_support_count: int, n_transactions: int) -> Dict:
+    def _build_tid_sets(self):
+        if self.tidlist == 'set':
+            self.tid_sets = build_tidsets(self.transactions)
+        else:
+            self.tid_sets = build_bitsets(self.transactions)
+
+    def _build_disk_tidlists(self, transactions):
+        if isinstance(transactions, DiskTidlists):
+            self.disk_tidlists = transactions
+        else:
+            if self.disk_tidlists is not None:
+                self.disk_tidlists.close()
+            self.disk_tidlists = DiskTidlists.build(transactions, self.storage_path, self.buffer_size)
+        self.transactions = self.disk_tidlists.vocabulary()
+        self.tid_sets = []
+
+    def _item_counts(self) -> List[int]:
+        if self.storage_path is not None:
+            return list(self.disk_tidlists.counts)
+        return [tidlist_count(tid_set) for tid_set in self.tid_sets]
+
+    def _class_items(self, item_ids: List[int], item_counts: List[int]):
+        counts = [item_counts[item_id] for item_id in item_ids]
+        if self.storage_path is not None:
+            capacity = self.buffer_size // self.n_jobs if len(item_ids) > 1 else self.buffer_size
+            pool = TidlistPool(self.disk_tidlists, capacity, self.tidlist != 'set')
+            return PooledItems(item_ids, counts, pool)
+        return [((item_id,), self.tid_sets[item_id], count) for item_id, count in zip(item_ids, counts)]
+
+    def _find_frequent_itemsets(self, min_support_count: float, n_transactions: int) -> Dict:
         frequent_itemsets = {}
 
         frequent_1 = {}
-        items_list = []
+        item_counts = self._item_counts()
+        frequent_ids = []
 
-        for item, tid_set in self.tid_sets.items():
-            support_count = len(tid_set)
-            if support_count >= min_support_count:
-                itemset = frozenset([item])
+        for item_id, support_count in enumerate(item_counts):
+            if support_count and support_count >= min_support_count:
+                itemset = (item_id,)
                 frequent_1[itemset] = support_count / n_transactions
-                items_list.append((item, tid_set))
+                self.support_index.add(itemset, support_count)
+                frequent_ids.append(item_id)
 
+        items_list = self._class_items(frequent_ids, item_counts)
         frequent_itemsets[1] = frequent_1
+        self.stats.add(1, 'candidates', len(item_counts))
+        self.stats.add(1, 'frequent', len(frequent_1))
 
-        self._eclat_recursive(items_list, min_support_count, n_transactions, frequent_itemsets, 2)
+        with self.stats.phase('intersect'):
+            if self.n_jobs > 1 and len(items_list) > 1:
+                mine_eclat_classes(self, items_list, min_support_count, n_transactions, frequent_itemsets)
+            else:
+                for i in range(len(items_list)):
+                    self._mine_class(items_list, i, min_support_count, n_transactions,
+                                     frequent_itemsets, 2)
+                    self.stats.progress(i + 1, len(items_list))
+        if isinstance(items_list, PooledItems):
+            self.stats.count('tidlist_reads', items_list.pool.misses)
+            self.stats.count('tidlist_pool_hits', items_list.pool.hits)
+        self.stats.end_levels()
 
         return frequent_itemsets
 
-    def _eclat_recursive(self, prefix_items: List[Tuple[str, Set[int]]],
-                        min_support_count: int,
+    def _eclat_recursive(self, prefix_items: List[Tuple[Tuple[int, ...], Tidlist, int]],
+                        min_support_count: float,
                         n_transactions: int,
                         frequent_itemsets: Dict,
                         k: int):
@@ -68,120 +208,135 @@ class EclatMiner:
             return
 
         for i in range(len(prefix_items)):
-            item_i, tid_i = prefix_items[i]
-
-            new_prefix_items = []
-
-            for j in range(i + 1, len(prefix_items)):
-                item_j, tid_j = prefix_items[j]
-
-                tid_intersection = tid_i & tid_j
-                support_count = len(tid_intersection)
-
-                if support_count >= min_support_count:
-                    if isinstance(item_i, frozenset):
-                        new_itemset = item_i | frozenset([item_j])
-                    elif isinstance(item_i, str):
-                        if isinstance(item_j, frozenset):
-                            new_itemset = frozenset([item_i]) | item_j
-                        else:
-                            new_itemset = frozenset([item_i, item_j])
-                    else:
-                        new_itemset = item_i | item_j
+            self._mine_class(prefix_items, i, min_support_count, n_transactions, frequent_itemsets, k)
+
+    def _mine_class(self, prefix_items: List[Tuple[Tuple[int, ...], Tidlist, int]],
+                    i: int,
+                    min_support_count: float,
+                    n_transactions: int,
+                    frequent_itemsets: Dict,
+                    k: int):
+        use_diffsets = self.tidlist == 'diffset'
+        itemset_i, tid_i, count_i = prefix_items[i]
+
+        new_prefix_items = []
+        self.stats.add(k, 'candidates', len(prefix_items) - i - 1)
+        self.stats.add(k, 'intersections', len(prefix_items) - i - 1)
+
+        for j in range(i + 1, len(prefix_items)):
+            itemset_j, tid_j, count_j = prefix_items[j]
+
+            if not use_diffsets:
+                tid_new = tid_i & tid_j
+                support_count = tidlist_count(tid_new)
+            elif k == 2:
+                tid_new = tidlist_difference(tid_i, tid_j)
+                support_count = count_i - tidlist_count(tid_new)
+            else:
+                tid_new = tidlist_difference(tid_j, tid_i)
+                support_count = count_i - tidlist_count(tid_new)
 
-                    if k not in frequent_itemsets:
-                        frequent_itemsets[k] = {}
+            if support_count >= min_support_count:
+                new_itemset = itemset_i + itemset_j[-1:]
 
-                    frequent_itemsets[k][new_itemset] = support_count / n_transactions
+                if k not in frequent_itemsets:
+                    frequent_itemsets[k] = {}
 
-                    new_prefix_items.append((new_itemset, tid_intersection))
+                frequent_itemsets[k][new_itemset] = support_count / n_transactions
+                self.support_index.add(new_itemset, support_count)
 
-            if new_prefix_items:
-                self._eclat_recursive(new_prefix_items, min_support_count, n_transactions,
-                                     frequent_itemsets, k + 1)
+                new_prefix_items.append((new_itemset, tid_new, support_count))
 
-    def _generate_rules(self) -> List[Dict]:
-        rules = []
+        self.stats.add(k, 'frequent', len(new_prefix_items))
+        if new_prefix_items:
+            self._eclat_recursive(new_prefix_items, min_support_count, n_transactions,
+                                 frequent_itemsets, k + 1)
 
-        for k in range(2, len(self.frequent_itemsets) + 1):
-            if k not in self.frequent_itemsets:
+    def _find_closed_itemsets(self, min_support_count: float) -> Dict[Tuple[int, ...], int]:
+        items_list = []
+        for item_id, tid_set in enumerate(self.tid_sets):
+            support_count = tidlist_count(tid_set)
+            if support_count and support_count >= min_support_count:
+                items_list.append((frozenset([item_id]), tid_set))
+
+        closed = {}
+        with self.stats.phase('intersect'):
+            self._charm_extend(items_list, min_support_count, closed)
+        self.stats.count('closed', len(closed))
+
+        return filter_closed({tuple(sorted(itemset)): count for itemset, count in closed.items()})
+
+    def _charm_extend(self, class_items: List[Tuple[frozenset, Tidlist]],
+                      min_support_count: float,
+                      closed: Dict[frozenset, int]):
+        class_items = sorted(class_items, key=lambda entry: tidlist_count(entry[1]))
+        removed = [False] * len(class_items)
+
+        for i in range(len(class_items)):
+            if removed[i]:
                 continue
 
-            for itemset, support in self.frequent_itemsets[k].items():
-                items = list(itemset)
-
-                for i in range(1, len(items)):
-                    for antecedent in combinations(items, i):
-                        antecedent = frozenset(antecedent)
-                        consequent = itemset - antecedent
-
-                        if not consequent:
-                            continue
-
-                        antecedent_support = self._get_support(antecedent)
-                        if antecedent_support == 0:
-                            continue
-
-                        confidence = support / antecedent_support
-
-                        if confidence >= self.min_confidence:
-                            consequent_support = self._get_support(consequent)
-                            lift = confidence / consequent_support if consequent_support > 0 else 0
-
-                            rules.append({
-                                'antecedent': set(antecedent),
-                                'consequent': set(consequent),
-                                'support': support,
-                                'confidence': confidence,
-                                'lift': lift
-                            })
-
+            itemset_i, tid_i = class_items[i]
+            new_class_items = []
+            self.stats.count('intersections', len(class_items) - i - 1)
+
+            for j in range(i + 1, len(class_items)):
+                if removed[j]:
+                    continue
+
+                itemset_j, tid_j = class_items[j]
+                tid_new = tid_i & tid_j
+                if tidlist_count(tid_new) < min_support_count:
+                    continue
+
+                if tid_i == tid_j:
+                    removed[j] = True
+                    itemset_i = itemset_i | itemset_j
+                elif tidlist_issubset(tid_i, tid_j):
+                    itemset_i = itemset_i | itemset_j
+                elif tidlist_issubset(tid_j, tid_i):
+                    removed[j] = True
+                    new_class_items.append((itemset_j, tid_new))
+                else:
+                    new_class_items.append((itemset_j, tid_new))
+
+            if new_class_items:
+                self._charm_extend([(itemset_i | itemset, tid) for itemset, tid in new_class_items],
+                                   min_support_count, closed)
+
+            count_i = tidlist_count(tid_i)
+            if closed.get(itemset_i, 0) < count_i:
+                closed[itemset_i] = count_i
+
+    def _generate_rules(self) -> RuleSet:
+        with self.stats.phase('generate_rules'):
+            rules = generate_rules(self.frequent_itemsets, self.support_index,
+                                   self.min_confidence, self.transactions.items)
+        self.stats.count('rules', len(rules))
         return rules
 
-    def _get_support(self, itemset: frozenset) -> float:
-        k = len(itemset)
-        if k in self.frequent_itemsets and itemset in self.frequent_itemsets[k]:
-            return self.frequent_itemsets[k][itemset]
-
-        if k == 1:
-            item = list(itemset)[0]
-            if item in self.tid_sets:
-                return len(self.tid_sets[item]) / len(self.transactions)
-
-        tid_intersection = None
-        for item in itemset:
-            if item not in self.tid_sets:
-                return 0.0
-            if tid_intersection is None:
-                tid_intersection = self.tid_sets[item].copy()
-            else:
-                tid_intersection &= self.tid_sets[item]
-
-        return len(tid_intersection) / len(self.transactions) if self.transactions else 0
+    def _update_rules(self, touched: Set[int]):
+        with self.stats.phase('generate_rules'):
+            rules, kept, dirty = update_rules(self.rules, self.frequent_itemsets, self.support_index,
+                                              self.min_confidence, self.transactions.items, touched)
+        self.stats.count('rules', len(rules))
+        self.stats.count('dirty_items', len(dirty))
+        self.rules = rules
+        with self.stats.phase('build_index'):
+            self.recommendation_index = self.recommendation_index.updated(rules, kept, dirty)
+
+    def get_frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        decode = self.transactions.decode
+        return {
+            k: {decode(itemset): support for itemset, support in itemsets.items()}
+            for k, itemsets in self.frequent_itemsets.items()
+        }
 
     def get_rules(self) -> List[Dict]:
-        return self.rules
-
-    def get_recommendations(self, item: str) -> List[Dict]:
-        recommendations = []
-
-        for rule in self.rules:
-            if item in rule['antecedent']:
-                for rec_item in rule['consequent']:
-                    recommendations.append({
-                        'item': rec_item,
-                        'confidence': rule['confidence'],
-                        'support': rule['support'],
-                        'lift': rule['lift']
-                    })
-
-        recommendations.sort(key=lambda x: x['confidence'], reverse=True)
-
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            if rec['item'] not in seen:
-                seen.add(rec['item'])
-                unique_recommendations.append(rec)
-
-        return unique_recommendations
+        return list(self.rules)
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.get(item, top_n)
+
+    def recommend(self, basket: List[str], top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.recommend(basket, top_n)
@@ -0,0 +1,299 @@
+import time
+from typing import List, Dict, Set, Tuple, Union, Optional
+from collections import defaultdict
+
+from src.algorithms.closed import OUTPUT_MODES, compact_itemsets, filter_closed
+from src.algorithms.incremental import touched_items, update_frequent_itemsets
+from src.algorithms.instrumentation import Hook, MiningStats
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.rules import generate_rules, update_rules
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.transactions import TransactionStore, as_store
+
+
+class FPNode:
+
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, count: int, parent):
+        self.item = item
+        self.count = count
+        self.parent = parent
+        self.children = {}
+
+
+class FPTree:
+
+    def __init__(self):
+        self.root = FPNode(None, 0, None)
+        self.header = defaultdict(list)
+
+    def insert(self, items: List[int], count: int):
+        node = self.root
+        for item in items:
+            child = node.children.get(item)
+            if child is None:
+                child = FPNode(item, 0, node)
+                node.children[item] = child
+                self.header[item].append(child)
+            child.count += count
+            node = child
+
+    def item_count(self, item: int) -> int:
+        return sum(node.count for node in self.header[item])
+
+    def prefix_paths(self, item: int) -> List[Tuple[List[int], int]]:
+        paths = []
+        for node in self.header[item]:
+            path = []
+            parent = node.parent
+            while parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                path.reverse()
+                paths.append((path, node.count))
+        return paths
+
+
+class FPGrowthMiner:
+
+    def __init__(self, min_support: float = 0.2, min_confidence: float = 0.5, output: str = 'all',
+                 hooks: Optional[List[Hook]] = None):
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output}', expected one of {OUTPUT_MODES}")
+
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.output = output
+        self.transactions = TransactionStore()
+        self.support_index = SupportIndex()
+        self.n_mined = 0
+        self.stats = MiningStats(hooks)
+        self.frequent_itemsets = {}
+        self.rules = RuleSet()
+        self.recommendation_index = RecommendationIndex(self.rules)
+        self.execution_time = 0
+
+    def fit(self, transactions: Union[List[List[str]], TransactionStore]) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        self.transactions = as_store(transactions)
+        n_transactions = len(self.transactions)
+        self.n_mined = n_transactions
+        min_support_count = self.min_support * n_transactions
+        self.support_index = SupportIndex(n_transactions)
+
+        with self.stats.phase('build_tree'):
+            tree = self._build_tree(min_support_count)
+        if self.output == 'all':
+            self.frequent_itemsets = {1: {}}
+            with self.stats.phase('mine_tree'):
+                self._mine_tree(tree, (), min_support_count, n_transactions, self.frequent_itemsets)
+        else:
+            closed_counts = {}
+            with self.stats.phase('mine_tree'):
+                self._mine_closed_tree(tree, (), min_support_count, closed_counts)
+            with self.stats.phase('compact'):
+                self.frequent_itemsets, self.support_index = compact_itemsets(
+                    filter_closed(closed_counts), self.output, n_transactions
+                )
+        self.stats.end_levels()
+        self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
+
+    @property
+    def incremental(self) -> bool:
+        return self.output == 'all'
+
+    def update(self, transactions: Optional[List[List[str]]] = None) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        if transactions is not None:
+            self.transactions.extend(transactions)
+
+        if self.output != 'all':
+            return self.fit(self.transactions)
+
+        touched = touched_items(self.transactions, self.n_mined)
+        with self.stats.phase('incremental_count'):
+            self.frequent_itemsets = update_frequent_itemsets(self.transactions, self.n_mined,
+                                                              self.support_index, self.min_support,
+                                                              self.stats)
+        self.n_mined = len(self.transactions)
+        self._update_rules(touched)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
+
+    def set_min_confidence(self, min_confidence: float) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        self.min_confidence = min_confidence
+        self.rules = self._generate_rules()
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+        }
+
+    def _build_tree(self, min_support_count: float) -> FPTree:
+        item_counts = self.transactions.item_counts()
+        frequent_counts = {
+            item_id: count
+            for item_id, count in enumerate(item_counts)
+            if count and count >= min_support_count
+        }
+        self.stats.add(1, 'candidates', len(item_counts))
+
+        tree = FPTree()
+        for transaction in self.transactions:
+            items = [item_id for item_id in transaction if item_id in frequent_counts]
+            if items:
+                items.sort(key=lambda item_id: (-frequent_counts[item_id], item_id))
+                tree.insert(items, 1)
+
+        return tree
+
+    def _count_level(self, suffix: Tuple[int, ...], item_counts: Dict[int, int],
+                     min_support_count: float):
+        level = len(suffix) + 1
+        if suffix:
+            self.stats.add(level, 'candidates', len(item_counts))
+        self.stats.add(level, 'frequent',
+                       sum(1 for count in item_counts.values() if count >= min_support_count))
+
+    def _mine_tree(self, tree: FPTree, suffix: Tuple[int, ...],
+                   min_support_count: float,
+                   n_transactions: int,
+                   frequent_itemsets: Dict):
+        item_counts = {item: tree.item_count(item) for item in tree.header}
+        self._count_level(suffix, item_counts, min_support_count)
+
+        ordered = sorted(item_counts, key=lambda item_id: (item_counts[item_id], item_id))
+        for position, item in enumerate(ordered, 1):
+            count = item_counts[item]
+            if count < min_support_count:
+                continue
+
+            new_suffix = suffix + (item,)
+            itemset = tuple(sorted(new_suffix))
+            if len(itemset) not in frequent_itemsets:
+                frequent_itemsets[len(itemset)] = {}
+            frequent_itemsets[len(itemset)][itemset] = count / n_transactions
+            self.support_index.add(itemset, count)
+
+            paths = tree.prefix_paths(item)
+            conditional_counts = defaultdict(int)
+            for path, path_count in paths:
+                for path_item in path:
+                    conditional_counts[path_item] += path_count
+
+            conditional_tree = FPTree()
+            for path, path_count in paths:
+                path = [
+                    path_item for path_item in path
+                    if conditional_counts[path_item] >= min_support_count
+                ]
+                if path:
+                    conditional_tree.insert(path, path_count)
+
+            if conditional_tree.header:
+                self._mine_tree(conditional_tree, new_suffix, min_support_count,
+                                n_transactions, frequent_itemsets)
+
+            if not suffix:
+                self.stats.progress(position, len(ordered))
+
+    def _mine_closed_tree(self, tree: FPTree, suffix: Tuple[int, ...],
+                          min_support_count: float,
+                          closed_counts: Dict[Tuple[int, ...], int]):
+        item_counts = {item: tree.item_count(item) for item in tree.header}
+        self._count_level(suffix, item_counts, min_support_count)
+
+        ordered = sorted(item_counts, key=lambda item_id: (item_counts[item_id], item_id))
+        for position, item in enumerate(ordered, 1):
+            count = item_counts[item]
+            if count < min_support_count:
+                continue
+
+            paths = tree.prefix_paths(item)
+            conditional_counts = defaultdict(int)
+            for path, path_count in paths:
+                for path_item in path:
+                    conditional_counts[path_item] += path_count
+
+            perfect = tuple(
+                path_item for path_item, path_count in conditional_counts.items()
+                if path_count == count
+            )
+            new_suffix = suffix + (item,) + perfect
+            closed_counts[tuple(sorted(new_suffix))] = count
+
+            conditional_tree = FPTree()
+            for path, path_count in paths:
+                path = [
+                    path_item for path_item in path
+                    if min_support_count <= conditional_counts[path_item] < count
+                ]
+                if path:
+                    conditional_tree.insert(path, path_count)
+
+            if conditional_tree.header:
+                self._mine_closed_tree(conditional_tree, new_suffix, min_support_count, closed_counts)
+
+            if not suffix:
+                self.stats.progress(position, len(ordered))
+
+    def _generate_rules(self) -> RuleSet:
+        with self.stats.phase('generate_rules'):
+            rules = generate_rules(self.frequent_itemsets, self.support_index,
+                                   self.min_confidence, self.transactions.items)
+        self.stats.count('rules', len(rules))
+        return rules
+
+    def _update_rules(self, touched: Set[int]):
+        with self.stats.phase('generate_rules'):
+            rules, kept, dirty = update_rules(self.rules, self.frequent_itemsets, self.support_index,
+                                              self.min_confidence, self.transactions.items, touched)
+        self.stats.count('rules', len(rules))
+        self.stats.count('dirty_items', len(dirty))
+        self.rules = rules
+        with self.stats.phase('build_index'):
+            self.recommendation_index = self.recommendation_index.updated(rules, kept, dirty)
+
+    def get_frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        decode = self.transactions.decode
+        return {
+            k: {decode(itemset): support for itemset, support in itemsets.items()}
+            for k, itemsets in self.frequent_itemsets.items()
+        }
+
+    def get_rules(self) -> List[Dict]:
+        return list(self.rules)
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.get(item, top_n)
+
+    def recommend(self, basket: List[str], top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.recommend(basket, top_n)
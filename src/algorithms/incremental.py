@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.algorithms.candidate_trie import CandidateTrie, generate_candidates
+from src.algorithms.instrumentation import MiningStats
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.transactions import TransactionStore
+
+
+def _count_range(candidates: List[Tuple[int, ...]], k: int, transactions: TransactionStore,
+                 start: int, stop: int) -> Dict[Tuple[int, ...], int]:
+    trie = CandidateTrie(candidates, k)
+    trie.count_transactions(transactions.iter_range(start, stop))
+    return dict(zip(trie.candidates, trie.counts))
+
+
+def touched_items(transactions: TransactionStore, start: int) -> Set[int]:
+    return set(transactions.indices[transactions.offsets[start]:transactions.offsets[len(transactions)]])
+
+
+def update_frequent_itemsets(transactions: TransactionStore, n_old: int,
+                             support_index: SupportIndex,
+                             min_support: float,
+                             stats: Optional[MiningStats] = None) -> Dict[int, Dict[Tuple[int, ...], float]]:
+    n_transactions = len(transactions)
+    min_support_count = min_support * n_transactions
+    min_increment_count = min_support * (n_transactions - n_old)
+    old_counts = support_index.counts
+    new_counts = {}
+    frequent_itemsets = {}
+
+    k = 1
+    candidates = [(item_id,) for item_id in range(transactions.n_items)]
+    while candidates:
+        increment_counts = _count_range(candidates, k, transactions, n_old, n_transactions)
+
+        counts = {}
+        promoted = []
+        for candidate, count in increment_counts.items():
+            if candidate in old_counts:
+                counts[candidate] = old_counts[candidate] + count
+            elif count and count >= min_increment_count:
+                counts[candidate] = count
+                promoted.append(candidate)
+
+        if promoted and n_old:
+            for candidate, count in _count_range(promoted, k, transactions, 0, n_old).items():
+                counts[candidate] += count
+            if stats is not None:
+                stats.count('support_fallbacks', len(promoted))
+
+        level = {}
+        for itemset, count in counts.items():
+            if count and count >= min_support_count:
+                level[itemset] = count / n_transactions
+                new_counts[itemset] = count
+
+        if stats is not None:
+            stats.add(k, 'candidates', len(candidates))
+            stats.add(k, 'rescanned', len(promoted) if n_old else 0)
+            stats.add(k, 'frequent', len(level))
+            stats.end_level(k)
+
+        if not level:
+            break
+
+        frequent_itemsets[k] = level
+        k += 1
+        candidates = list(generate_candidates(level, k, stats))
+
+    if 1 not in frequent_itemsets:
+        frequent_itemsets[1] = {}
+
+    support_index.n_transactions = n_transactions
+    support_index.counts = new_counts
+    return frequent_itemsets
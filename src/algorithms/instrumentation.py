@@ -0,0 +1,88 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+Hook = Callable[[str, Dict], None]
+
+
+class MiningStats:
+
+    def __init__(self, hooks: Optional[Iterable[Hook]] = None):
+        self.hooks = list(hooks or [])
+        self.phases: Dict[str, float] = {}
+        self.levels: Dict[int, Dict[str, int]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['hooks'] = []
+        return state
+
+    def fresh(self) -> 'MiningStats':
+        return MiningStats(self.hooks)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.emit('phase_start', {'phase': name})
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start_time) * 1000
+            self.phases[name] = self.phases.get(name, 0) + elapsed
+            self.emit('phase_end', {'phase': name, 'elapsed_ms': elapsed})
+
+    def add(self, level: int, counter: str, value: int = 1):
+        counters = self.levels.get(level)
+        if counters is None:
+            counters = self.levels[level] = {}
+        counters[counter] = counters.get(counter, 0) + value
+
+    def count(self, counter: str, value: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def merge_levels(self, levels: Dict[int, Dict[str, int]]):
+        for level, counters in levels.items():
+            for counter, value in counters.items():
+                self.add(level, counter, value)
+
+    def merge(self, other: 'MiningStats'):
+        for name, elapsed in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0) + elapsed
+        for counter, value in other.counters.items():
+            self.count(counter, value)
+        self.merge_levels(other.levels)
+
+    def end_level(self, level: int):
+        self.emit('level', {'level': level, **self.levels.get(level, {})})
+
+    def end_levels(self):
+        for level in sorted(self.levels):
+            self.end_level(level)
+
+    def progress(self, done: int, total: int):
+        self.emit('progress', {'done': done, 'total': total})
+
+    def total(self, counter: str) -> int:
+        return sum(counters.get(counter, 0) for counters in self.levels.values())
+
+    def emit(self, event: str, payload: Dict):
+        for hook in self.hooks:
+            hook(event, payload)
+
+    def to_dict(self) -> Dict:
+        return {
+            'phases': dict(self.phases),
+            'levels': {level: dict(self.levels[level]) for level in sorted(self.levels)},
+            'counters': dict(self.counters)
+        }
+
+
+def json_lines_hook(filepath: str, **labels) -> Hook:
+    def hook(event: str, payload: Dict):
+        record = {'time': time.time(), 'event': event, **labels, **payload}
+        with open(filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    return hook
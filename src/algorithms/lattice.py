@@ -0,0 +1,61 @@
+import copy
+
+from src.algorithms.closed import compact_itemsets
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.support_index import SupportIndex
+
+
+def can_derive(base, min_support: float, min_confidence: float) -> bool:
+    return base.min_support <= min_support and base.min_confidence <= min_confidence
+
+
+def derive_miner(base, min_support: float, min_confidence: float):
+    n_transactions = base.support_index.n_transactions
+    min_support_count = min_support * n_transactions
+
+    derived = copy.copy(base)
+    derived.min_support = min_support
+    derived.min_confidence = min_confidence
+    derived.execution_time = 0
+
+    if getattr(base, 'output', 'all') != 'all':
+        closed_counts = {
+            itemset: count for itemset, count in base.support_index.counts.items()
+            if count >= min_support_count
+        }
+        derived.frequent_itemsets, derived.support_index = compact_itemsets(
+            closed_counts, base.output, n_transactions
+        )
+        if base.output == 'maximal':
+            derived.rules = derived._generate_rules()
+            derived.recommendation_index = RecommendationIndex(derived.rules)
+            return derived
+    else:
+        derived.support_index, derived.frequent_itemsets = _filter_itemsets(base, min_support_count)
+
+    support = base.rules.support
+    derived.rules = base.rules.select(
+        rule_id for rule_id in base.rules.where(confidence=min_confidence)
+        if round(support[rule_id] * n_transactions) >= min_support_count
+    )
+    derived.recommendation_index = RecommendationIndex(derived.rules)
+
+    return derived
+
+
+def _filter_itemsets(base, min_support_count: float):
+    support_index = SupportIndex(base.support_index.n_transactions)
+    frequent_itemsets = {}
+
+    for k, itemsets in base.frequent_itemsets.items():
+        level = {}
+        for itemset, support in itemsets.items():
+            count = base.support_index.count(itemset)
+            if count >= min_support_count:
+                level[itemset] = support
+                support_index.add(itemset, count)
+
+        if level or k == 1:
+            frequent_itemsets[k] = level
+
+    return support_index, frequent_itemsets
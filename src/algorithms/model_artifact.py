@@ -0,0 +1,252 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b'DMMODEL1'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+
+def _csr(rows: Iterable[Iterable[int]], typecode: str = 'i') -> Tuple[array, array]:
+    offsets = array('q', [0])
+    values = array(typecode)
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def save_model(miner, filepath: str, algorithm: Optional[str] = None):
+    store = miner.transactions
+    items = store.items
+    item_bytes = [item.encode('utf-8') for item in items]
+    item_offsets = array('q', [0])
+    for encoded in item_bytes:
+        item_offsets.append(item_offsets[-1] + len(encoded))
+
+    itemsets = []
+    counts = array('q')
+    support_index = getattr(miner, 'support_index', None)
+    for k in sorted(getattr(miner, 'frequent_itemsets', {})):
+        for itemset in sorted(miner.frequent_itemsets[k]):
+            itemsets.append(itemset)
+            counts.append(support_index.count(itemset))
+    itemset_offsets, itemset_items = _csr(itemsets)
+
+    rules = miner.rules
+    antecedent_offsets, antecedent_items = _csr(rules.itemsets[itemset_id] for itemset_id in rules.antecedents)
+    consequent_offsets, consequent_items = _csr(rules.itemsets[itemset_id] for itemset_id in rules.consequents)
+
+    index = miner.recommendation_index
+    item_rule_offsets, item_rule_ids = _csr(index.rules_by_item.get(item, ()) for item in items)
+    ranked = [index.rank_rule_ids(index.rules_by_item.get(item, ())) for item in items]
+    rec_offsets, rec_items = _csr(
+        [store.item_ids[rec_item] for rec_item, _ in recommendations] for recommendations in ranked
+    )
+    _, rec_rule_ids = _csr([rule_id for _, rule_id in recommendations] for recommendations in ranked)
+
+    sections = {
+        'item_offsets': item_offsets,
+        'item_bytes': array('B', b''.join(item_bytes)),
+        'itemset_offsets': itemset_offsets,
+        'itemset_items': itemset_items,
+        'itemset_counts': counts,
+        'antecedent_offsets': antecedent_offsets,
+        'antecedent_items': antecedent_items,
+        'consequent_offsets': consequent_offsets,
+        'consequent_items': consequent_items,
+        'rule_support': rules.support,
+        'rule_confidence': rules.confidence,
+        'rule_lift': rules.lift,
+        'item_rule_offsets': item_rule_offsets,
+        'item_rule_ids': item_rule_ids,
+        'rec_offsets': rec_offsets,
+        'rec_items': rec_items,
+        'rec_rule_ids': rec_rule_ids
+    }
+
+    layout = {}
+    position = 0
+    for name, values in sections.items():
+        layout[name] = [values.typecode, position, len(values) * values.itemsize]
+        position += -(-layout[name][2] // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'algorithm': algorithm or type(miner).__name__,
+        'min_support': getattr(miner, 'min_support', None),
+        'min_confidence': getattr(miner, 'min_confidence', None),
+        'output': getattr(miner, 'output', 'all'),
+        'n_transactions': len(store),
+        'sections': layout
+    }).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = f'{filepath}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, values in sections.items():
+            f.write(b'\0' * (data_start + layout[name][1] - f.tell()))
+            f.write(values.tobytes())
+    os.replace(tmp_path, filepath)
+
+
+class MinedModel:
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{filepath} is not a mined model file')
+
+        header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        if self.header['version'] != FORMAT_VERSION or self.header['byteorder'] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f'{filepath} was written by an incompatible version or platform')
+
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+        buffer = memoryview(self._mmap)
+        self._views = [buffer]
+        for name, (typecode, offset, length) in self.header['sections'].items():
+            start = data_start + offset
+            view = buffer[start:start + length].cast(typecode)
+            self._views.append(view)
+            setattr(self, name, view)
+
+        self.algorithm = self.header['algorithm']
+        self.min_support = self.header['min_support']
+        self.min_confidence = self.header['min_confidence']
+        self.output = self.header['output']
+        self.n_transactions = self.header['n_transactions']
+
+        raw = bytes(self.item_bytes)
+        offsets = self.item_offsets
+        self.items = [
+            raw[offsets[item_id]:offsets[item_id + 1]].decode('utf-8')
+            for item_id in range(len(offsets) - 1)
+        ]
+        self.item_ids = {item: item_id for item_id, item in enumerate(self.items)}
+        self._itemset_counts: Optional[Dict[Tuple[int, ...], int]] = None
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> 'MinedModel':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def n_rules(self) -> int:
+        return len(self.rule_support)
+
+    def _decode(self, offsets, values, index: int) -> set:
+        return {self.items[item_id] for item_id in values[offsets[index]:offsets[index + 1]]}
+
+    def rule(self, rule_id: int) -> Dict:
+        return {
+            'antecedent': self._decode(self.antecedent_offsets, self.antecedent_items, rule_id),
+            'consequent': self._decode(self.consequent_offsets, self.consequent_items, rule_id),
+            'support': self.rule_support[rule_id],
+            'confidence': self.rule_confidence[rule_id],
+            'lift': self.rule_lift[rule_id]
+        }
+
+    def get_rules(self) -> List[Dict]:
+        return [self.rule(rule_id) for rule_id in range(self.n_rules)]
+
+    def get_frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        frequent_itemsets = defaultdict(dict)
+        offsets = self.itemset_offsets
+        for index in range(len(self.itemset_counts)):
+            itemset = frozenset(self._decode(offsets, self.itemset_items, index))
+            frequent_itemsets[len(itemset)][itemset] = self.itemset_counts[index] / self.n_transactions
+        return dict(frequent_itemsets)
+
+    def support(self, itemset: Iterable[str]) -> Optional[float]:
+        if self._itemset_counts is None:
+            offsets = self.itemset_offsets
+            self._itemset_counts = {
+                tuple(self.itemset_items[offsets[index]:offsets[index + 1]]): self.itemset_counts[index]
+                for index in range(len(self.itemset_counts))
+            }
+
+        ids = []
+        for item in itemset:
+            if item not in self.item_ids:
+                return None
+            ids.append(self.item_ids[item])
+
+        count = self._itemset_counts.get(tuple(sorted(set(ids))))
+        return None if count is None else count / self.n_transactions
+
+    def _recommendation(self, rec_item_id: int, rule_id: int) -> Dict:
+        return {
+            'item': self.items[rec_item_id],
+            'confidence': self.rule_confidence[rule_id],
+            'support': self.rule_support[rule_id],
+            'lift': self.rule_lift[rule_id]
+        }
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        item_id = self.item_ids.get(item)
+        if item_id is None:
+            return []
+
+        start = self.rec_offsets[item_id]
+        stop = self.rec_offsets[item_id + 1]
+        if top_n is not None:
+            stop = min(stop, start + top_n)
+
+        return [
+            self._recommendation(self.rec_items[position], self.rec_rule_ids[position])
+            for position in range(start, stop)
+        ]
+
+    def recommend(self, basket: Iterable[str], top_n: Optional[int] = None) -> List[Dict]:
+        basket = set(basket)
+
+        hits = defaultdict(int)
+        for item in basket:
+            item_id = self.item_ids.get(item)
+            if item_id is None:
+                continue
+            start = self.item_rule_offsets[item_id]
+            for rule_id in self.item_rule_ids[start:self.item_rule_offsets[item_id + 1]]:
+                hits[rule_id] += 1
+
+        offsets = self.antecedent_offsets
+        matched = sorted(
+            (
+                rule_id for rule_id, count in hits.items()
+                if count == offsets[rule_id + 1] - offsets[rule_id]
+            ),
+            key=lambda rule_id: (-self.rule_confidence[rule_id], rule_id)
+        )
+
+        seen = {self.item_ids[item] for item in basket if item in self.item_ids}
+        recommendations = []
+        for rule_id in matched:
+            start = self.consequent_offsets[rule_id]
+            for rec_item_id in self.consequent_items[start:self.consequent_offsets[rule_id + 1]]:
+                if rec_item_id not in seen:
+                    seen.add(rec_item_id)
+                    recommendations.append(self._recommendation(rec_item_id, rule_id))
+
+        return recommendations[:top_n] if top_n is not None else recommendations
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.algorithms.candidate_trie import CandidateTrie
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.transactions import TransactionStore
+
+MAX_JOBS = os.cpu_count() or 1
+
+_worker_state = {}
+
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    _context = multiprocessing.get_context('forkserver')
+    _context.set_forkserver_preload([__name__])
+else:
+    _context = multiprocessing.get_context('spawn')
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, MAX_JOBS + 1 + n_jobs)
+    return min(n_jobs, MAX_JOBS)
+
+
+def _init_worker(state: Dict):
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _count_partition(task: Tuple[List[Tuple[int, ...]], int, int, int]) -> List[int]:
+    candidates, k, start, stop = task
+    trie = CandidateTrie(candidates, k)
+    trie.count_transactions(_worker_state['transactions'].iter_range(start, stop))
+    return trie.counts
+
+
+def _mine_eclat_class(i: int) -> Tuple[Dict, Dict, Dict, Tuple[int, int]]:
+    miner = _worker_state['miner']
+    miner.support_index = SupportIndex(_worker_state['n_transactions'])
+    miner.stats = miner.stats.fresh()
+    frequent_itemsets = {}
+    items_list = _worker_state['items_list']
+    pool = getattr(items_list, 'pool', None)
+    hits, misses = (pool.hits, pool.misses) if pool is not None else (0, 0)
+
+    miner._mine_class(items_list, i, _worker_state['min_support_count'],
+                      _worker_state['n_transactions'], frequent_itemsets, 2)
+
+    if pool is not None:
+        hits, misses = pool.hits - hits, pool.misses - misses
+    return frequent_itemsets, miner.support_index.counts, miner.stats.levels, (hits, misses)
+
+
+class PartitionPool:
+
+    def __init__(self, pool, n_transactions: int, n_partitions: int):
+        self.pool = pool
+        step = -(-n_transactions // n_partitions)
+        self.partitions = [
+            (start, min(start + step, n_transactions))
+            for start in range(0, n_transactions, step)
+        ]
+
+    def count(self, trie: CandidateTrie):
+        tasks = [(trie.candidates, trie.k, start, stop) for start, stop in self.partitions]
+        for counts in self.pool.map(_count_partition, tasks):
+            for index, count in enumerate(counts):
+                trie.counts[index] += count
+
+
+@contextmanager
+def partition_pool(n_jobs: int, transactions: TransactionStore) -> Iterator[Optional[PartitionPool]]:
+    if n_jobs <= 1 or len(transactions) < n_jobs:
+        yield None
+        return
+
+    with _context.Pool(n_jobs, initializer=_init_worker, initargs=({'transactions': transactions},)) as pool:
+        yield PartitionPool(pool, len(transactions), n_jobs)
+
+
+def mine_eclat_classes(miner, items_list: List, min_support_count: float,
+                       n_transactions: int, frequent_itemsets: Dict):
+    state = {
+        'miner': type(miner)(miner.min_support, miner.min_confidence, miner.tidlist),
+        'items_list': items_list,
+        'min_support_count': min_support_count,
+        'n_transactions': n_transactions
+    }
+
+    with _context.Pool(miner.n_jobs, initializer=_init_worker, initargs=(state,)) as pool:
+        for done, (class_itemsets, class_counts, class_levels, (hits, misses)) in enumerate(
+                pool.imap(_mine_eclat_class, range(len(items_list))), 1):
+            miner.stats.merge_levels(class_levels)
+            if hits or misses:
+                items_list.pool.hits += hits
+                items_list.pool.misses += misses
+            miner.stats.progress(done, len(items_list))
+            for k in sorted(class_itemsets):
+                if k not in frequent_itemsets:
+                    frequent_itemsets[k] = {}
+                frequent_itemsets[k].update(class_itemsets[k])
+
+            for itemset, count in class_counts.items():
+                miner.support_index.add(itemset, count)
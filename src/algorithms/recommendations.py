@@ -0,0 +1,92 @@
+import copy
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.algorithms.ruleset import RuleSet
+
+
+class RecommendationIndex:
+
+    def __init__(self, rules: RuleSet):
+        self.rules = rules
+        self.rules_by_item = defaultdict(list)
+        self.ranked: Dict[str, List[Tuple[str, int]]] = {}
+
+        self._index_rules(range(len(rules)))
+        for item, rule_ids in self.rules_by_item.items():
+            self.ranked[item] = self.rank_rule_ids(rule_ids)
+
+    def _index_rules(self, rule_ids: Iterable[int]):
+        for rule_id in rule_ids:
+            for item in self.rules.decode(self.rules.antecedents[rule_id]):
+                self.rules_by_item[item].append(rule_id)
+
+    def updated(self, rules: RuleSet, kept: array, dirty: Set[int]) -> 'RecommendationIndex':
+        items = rules.items
+        dirty = {items[item_id] for item_id in dirty} if items is not None else set(dirty)
+
+        index = copy.copy(self)
+        index.rules = rules
+        index.rules_by_item = defaultdict(list)
+        index.ranked = {}
+
+        for item, rule_ids in self.rules_by_item.items():
+            rule_ids = [kept[rule_id] for rule_id in rule_ids if kept[rule_id] >= 0]
+            if rule_ids:
+                index.rules_by_item[item] = rule_ids
+            if item not in dirty:
+                index.ranked[item] = [(rec_item, kept[rule_id]) for rec_item, rule_id in self.ranked[item]]
+
+        index._index_rules(range(len(kept) - kept.count(-1), len(rules)))
+        for item in dirty:
+            rule_ids = index.rules_by_item.get(item)
+            if rule_ids:
+                index.ranked[item] = index.rank_rule_ids(rule_ids)
+        return index
+
+    def rank_rule_ids(self, rule_ids: Iterable[int], exclude: Iterable[str] = ()) -> List[Tuple[str, int]]:
+        confidence = self.rules.confidence
+        ranked = sorted(rule_ids, key=lambda rule_id: (-confidence[rule_id], rule_id))
+
+        seen = set(exclude)
+        recommendations = []
+        for rule_id in ranked:
+            for rec_item in self.rules.decode(self.rules.consequents[rule_id]):
+                if rec_item not in seen:
+                    seen.add(rec_item)
+                    recommendations.append((rec_item, rule_id))
+
+        return recommendations
+
+    def _materialize(self, ranked: Iterable[Tuple[str, int]]) -> List[Dict]:
+        rules = self.rules
+        return [
+            {
+                'item': rec_item,
+                'confidence': rules.confidence[rule_id],
+                'support': rules.support[rule_id],
+                'lift': rules.lift[rule_id]
+            }
+            for rec_item, rule_id in ranked
+        ]
+
+    def get(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        ranked = self.ranked.get(item, [])
+        return self._materialize(ranked[:top_n] if top_n is not None else ranked)
+
+    def recommend(self, basket: Iterable[str], top_n: Optional[int] = None) -> List[Dict]:
+        basket = set(basket)
+
+        hits = defaultdict(int)
+        for item in basket:
+            for rule_id in self.rules_by_item.get(item, ()):
+                hits[rule_id] += 1
+
+        matched = [
+            rule_id for rule_id, count in hits.items()
+            if count == len(self.rules.antecedent(rule_id))
+        ]
+
+        recommendations = self.rank_rule_ids(matched, exclude=basket)
+        return self._materialize(recommendations[:top_n] if top_n is not None else recommendations)
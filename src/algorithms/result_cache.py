@@ -0,0 +1,184 @@
+import copy
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.algorithms.lattice import can_derive, derive_miner
+from src.algorithms.transactions import TransactionStore
+
+
+class MiningResultCache:
+
+    def __init__(self, max_entries: int = 32, directory: Optional[str] = None,
+                 max_disk_entries: int = 256):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.stats = {'hits': 0, 'lattice_hits': 0, 'rule_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def fit(self, miner, transactions: TransactionStore,
+            fingerprint: Optional[str] = None) -> Tuple[object, Dict]:
+        fingerprint = fingerprint or transactions.fingerprint()
+        itemset_key = self._itemset_key(miner, fingerprint)
+        key = itemset_key + (miner.min_confidence,)
+
+        with self.lock:
+            cached = self._get(key, transactions)
+            if cached is not None:
+                self.stats['hits'] += 1
+                return cached, self._metrics(cached, 'hit', 0)
+
+            lattice_base = self._find_lattice(itemset_key, miner.min_support, miner.min_confidence)
+            rules_base = self._find_itemsets(itemset_key) if lattice_base is None else None
+
+        if lattice_base is not None:
+            start_time = time.time()
+            derived = derive_miner(lattice_base, miner.min_support, miner.min_confidence)
+            metrics = self._metrics(derived, 'lattice', (time.time() - start_time) * 1000)
+            stat = 'lattice_hits'
+        elif rules_base is not None:
+            derived = copy.copy(rules_base)
+            metrics = derived.set_min_confidence(miner.min_confidence)
+            metrics['cache'] = 'rules'
+            stat = 'rule_hits'
+        else:
+            derived = miner
+            metrics = miner.fit(transactions)
+            metrics['cache'] = 'miss'
+            stat = 'misses'
+
+        with self.lock:
+            self.stats[stat] += 1
+            self._put(key, derived)
+        return derived, metrics
+
+    def discard(self, fingerprint: str):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == fingerprint]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _itemset_key(self, miner, fingerprint: str) -> Tuple:
+        return (fingerprint, type(miner).__name__, getattr(miner, 'tidlist', None),
+                getattr(miner, 'output', 'all'), miner.min_support)
+
+    def _metrics(self, miner, cache: str, execution_time: float) -> Dict:
+        return {
+            'execution_time': execution_time,
+            'num_rules': len(miner.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in miner.frequent_itemsets.values()),
+            'cache': cache
+        }
+
+    def _get(self, key: Tuple, transactions: TransactionStore):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.entries[key].transactions = transactions
+            return self.entries[key]
+
+        miner = self._load(key, transactions)
+        if miner is not None:
+            self.stats['disk_hits'] += 1
+            self._remember(key, miner)
+        return miner
+
+    def _find_lattice(self, itemset_key: Tuple, min_support: float, min_confidence: float):
+        best_key = None
+        for key, cached in self.entries.items():
+            if key[:4] != itemset_key[:4] or not can_derive(cached, min_support, min_confidence):
+                continue
+            if best_key is None or key[4] > best_key[4]:
+                best_key = key
+
+        if best_key is None:
+            return None
+
+        self.entries.move_to_end(best_key)
+        return self.entries[best_key]
+
+    def _find_itemsets(self, itemset_key: Tuple):
+        for key in reversed(self.entries):
+            if key[:-1] == itemset_key:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        return None
+
+    def _put(self, key: Tuple, miner):
+        self._remember(key, miner)
+        self._save(key, miner)
+
+    def _remember(self, key: Tuple, miner):
+        self.entries[key] = miner
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _path(self, key: Tuple) -> str:
+        name = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f'{name}.pkl')
+
+    def _save(self, key: Tuple, miner):
+        if not self.directory:
+            return
+
+        transactions = miner.transactions
+        miner.transactions = None
+        try:
+            path = self._path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, miner), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        finally:
+            miner.transactions = transactions
+
+        self._evict_disk()
+
+    def _load(self, key: Tuple, transactions: TransactionStore):
+        if not self.directory:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, miner = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if stored_key != key:
+            return None
+
+        os.utime(path)
+        miner.transactions = transactions
+        return miner
+
+    def _evict_disk(self):
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith('.pkl')
+        ]
+        if len(paths) <= self.max_disk_entries:
+            return
+
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,67 @@
+import json
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.algorithms.ruleset import RULE_METRICS, RuleSet
+
+
+def serialize_rule(rule: Dict) -> Dict:
+    serialized = {
+        'antecedent': sorted(rule['antecedent']),
+        'consequent': sorted(rule['consequent']),
+        'support': rule['support'],
+        'confidence': rule['confidence'],
+        'lift': rule['lift']
+    }
+    if 'leverage' in rule:
+        serialized['leverage'] = rule['leverage']
+        serialized['conviction'] = rule['conviction'] if math.isfinite(rule['conviction']) else None
+    if 'support_interval' in rule:
+        serialized['support_interval'] = list(rule['support_interval'])
+        serialized['confidence_interval'] = list(rule['confidence_interval'])
+    return serialized
+
+
+class RuleCatalog:
+
+    def __init__(self, rules: RuleSet):
+        self.rules = rules
+        self.rules_by_item = defaultdict(list)
+        self.rows: List[Optional[str]] = [None] * len(rules)
+
+        for rule_id, (antecedent_id, consequent_id) in enumerate(zip(rules.antecedents, rules.consequents)):
+            for item in rules.decode(antecedent_id) | rules.decode(consequent_id):
+                self.rules_by_item[item].append(rule_id)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def query(self, item: Optional[str] = None, min_support: float = 0.0,
+              min_confidence: float = 0.0, min_lift: float = 0.0,
+              sort: str = 'confidence', descending: bool = True) -> Sequence[int]:
+        if sort not in RULE_METRICS:
+            raise ValueError(f"Unknown sort key '{sort}', expected one of {RULE_METRICS}")
+
+        if item is not None:
+            column = self.rules.metric(sort)
+            rule_ids = sorted(self.rules_by_item.get(item, ()), key=column.__getitem__,
+                              reverse=descending)
+        else:
+            rule_ids = self.rules.order(sort, descending)
+
+        return self.rules.where(rule_ids, support=min_support, confidence=min_confidence,
+                                lift=min_lift)
+
+    def row(self, rule_id: int) -> str:
+        row = self.rows[rule_id]
+        if row is None:
+            row = self.rows[rule_id] = json.dumps(serialize_rule(self.rules[rule_id]))
+        return row
+
+    def to_json(self, rule_ids: Iterable[int]) -> str:
+        return '[' + ', '.join(self.row(rule_id) for rule_id in rule_ids) + ']'
+
+    def iter_ndjson(self, rule_ids: Iterable[int]) -> Iterator[str]:
+        for rule_id in rule_ids:
+            yield self.row(rule_id) + '\n'
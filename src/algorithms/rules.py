@@ -0,0 +1,107 @@
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from src.algorithms.candidate_trie import generate_candidates
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.support_index import SupportIndex
+
+
+def _add_itemset_rules(rules: RuleSet, itemset: Tuple[int, ...], support: float,
+                       support_index: SupportIndex, min_confidence: float):
+    k = len(itemset)
+    consequents = [(item,) for item in itemset]
+    m = 1
+
+    while consequents and m < k:
+        passed = []
+
+        for consequent in consequents:
+            antecedent = tuple(item for item in itemset if item not in consequent)
+
+            antecedent_support = support_index.support(antecedent)
+            if antecedent_support == 0:
+                continue
+
+            confidence = support / antecedent_support
+
+            if confidence >= min_confidence:
+                consequent_support = support_index.support(consequent)
+                lift = confidence / consequent_support if consequent_support > 0 else 0
+
+                rules.add(antecedent, consequent, support, confidence, lift)
+                passed.append(consequent)
+
+        m += 1
+        consequents = generate_candidates(set(passed), m) if m < k else []
+
+
+def generate_rules(frequent_itemsets: Dict[int, Dict[Tuple[int, ...], float]],
+                   support_index: SupportIndex,
+                   min_confidence: float,
+                   items: List[str]) -> RuleSet:
+    rules = RuleSet(items)
+
+    for k in sorted(frequent_itemsets):
+        if k < 2:
+            continue
+
+        for itemset, support in frequent_itemsets[k].items():
+            _add_itemset_rules(rules, itemset, support, support_index, min_confidence)
+
+    return rules
+
+
+def update_rules(previous: RuleSet,
+                 frequent_itemsets: Dict[int, Dict[Tuple[int, ...], float]],
+                 support_index: SupportIndex,
+                 min_confidence: float,
+                 items: List[str],
+                 touched: Set[int]) -> Tuple[RuleSet, array, Set[int]]:
+    rules = RuleSet(items)
+    kept = array('l', [-1]) * len(previous)
+    dirty = set()
+    regenerate = set()
+
+    frequent = {}
+    for k, itemsets in frequent_itemsets.items():
+        if k >= 2:
+            frequent.update(itemsets)
+
+    rules_by_itemset = defaultdict(list)
+    for rule_id in range(len(previous)):
+        itemset = tuple(sorted(previous.antecedent(rule_id) + previous.consequent(rule_id)))
+        rules_by_itemset[itemset].append(rule_id)
+
+    for itemset, rule_ids in rules_by_itemset.items():
+        support = frequent.get(itemset)
+        if support is None or not touched.isdisjoint(itemset):
+            dirty.update(itemset)
+            continue
+
+        carried = []
+        for rule_id in rule_ids:
+            antecedent = previous.antecedent(rule_id)
+            consequent = previous.consequent(rule_id)
+            confidence = support / support_index.support(antecedent)
+            if confidence < min_confidence:
+                regenerate.add(itemset)
+                dirty.update(itemset)
+                break
+            consequent_support = support_index.support(consequent)
+            lift = confidence / consequent_support if consequent_support > 0 else 0
+            carried.append((rule_id, antecedent, consequent, confidence, lift))
+        else:
+            for rule_id, antecedent, consequent, confidence, lift in carried:
+                kept[rule_id] = rules.add(antecedent, consequent, support, confidence, lift)
+
+    for k in sorted(frequent_itemsets):
+        if k < 2:
+            continue
+
+        for itemset, support in frequent_itemsets[k].items():
+            if itemset in regenerate or not touched.isdisjoint(itemset):
+                _add_itemset_rules(rules, itemset, support, support_index, min_confidence)
+                dirty.update(itemset)
+
+    return rules, kept, dirty
@@ -0,0 +1,151 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+RULE_METRICS = ('support', 'confidence', 'lift', 'leverage', 'conviction')
+
+
+class RuleSet:
+
+    def __init__(self, items: Optional[List[str]] = None):
+        self.items = items
+        self.itemsets: List[Tuple[int, ...]] = []
+        self.itemset_ids: Dict[Tuple[int, ...], int] = {}
+        self.antecedents = array('l')
+        self.consequents = array('l')
+        self.support = array('d')
+        self.confidence = array('d')
+        self.lift = array('d')
+        self.intervals: Dict[str, Tuple[array, array]] = {}
+        self._metrics: Dict[str, array] = {}
+        self._orders: Dict[Tuple[str, bool], array] = {}
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[Dict]) -> 'RuleSet':
+        items = []
+        item_ids = {}
+
+        def encode(itemset: Iterable[str]) -> Tuple[int, ...]:
+            ids = set()
+            for item in itemset:
+                if item not in item_ids:
+                    item_ids[item] = len(items)
+                    items.append(item)
+                ids.add(item_ids[item])
+            return tuple(sorted(ids))
+
+        ruleset = cls(items)
+        for rule in rules:
+            ruleset.add(encode(rule['antecedent']), encode(rule['consequent']),
+                        rule['support'], rule['confidence'], rule['lift'])
+        return ruleset
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['_metrics'] = {}
+        state['_orders'] = {}
+        return state
+
+    def __len__(self) -> int:
+        return len(self.support)
+
+    def __getitem__(self, rule_id: int) -> Dict:
+        rule = {
+            'antecedent': set(self.decode(self.antecedents[rule_id])),
+            'consequent': set(self.decode(self.consequents[rule_id])),
+            'support': self.support[rule_id],
+            'confidence': self.confidence[rule_id],
+            'lift': self.lift[rule_id],
+            'leverage': self.metric('leverage')[rule_id],
+            'conviction': self.metric('conviction')[rule_id]
+        }
+        for name, (low, high) in self.intervals.items():
+            rule[name] = (low[rule_id], high[rule_id])
+        return rule
+
+    def __iter__(self) -> Iterator[Dict]:
+        for rule_id in range(len(self)):
+            yield self[rule_id]
+
+    def intern(self, itemset: Tuple[int, ...]) -> int:
+        itemset_id = self.itemset_ids.get(itemset)
+        if itemset_id is None:
+            itemset_id = len(self.itemsets)
+            self.itemset_ids[itemset] = itemset_id
+            self.itemsets.append(itemset)
+        return itemset_id
+
+    def add(self, antecedent: Tuple[int, ...], consequent: Tuple[int, ...],
+            support: float, confidence: float, lift: float) -> int:
+        self.antecedents.append(self.intern(antecedent))
+        self.consequents.append(self.intern(consequent))
+        self.support.append(support)
+        self.confidence.append(confidence)
+        self.lift.append(lift)
+        self._metrics = {}
+        self._orders = {}
+        return len(self.support) - 1
+
+    def decode(self, itemset_id: int) -> frozenset:
+        itemset = self.itemsets[itemset_id]
+        if self.items is None:
+            return frozenset(itemset)
+        items = self.items
+        return frozenset(items[item_id] for item_id in itemset)
+
+    def antecedent(self, rule_id: int) -> Tuple[int, ...]:
+        return self.itemsets[self.antecedents[rule_id]]
+
+    def consequent(self, rule_id: int) -> Tuple[int, ...]:
+        return self.itemsets[self.consequents[rule_id]]
+
+    def metric(self, name: str) -> array:
+        if name in ('support', 'confidence', 'lift'):
+            return getattr(self, name)
+        if name not in RULE_METRICS:
+            raise ValueError(f"Unknown metric '{name}', expected one of {RULE_METRICS}")
+
+        column = self._metrics.get(name)
+        if column is None:
+            if name == 'leverage':
+                column = array('d', [
+                    support - support / lift if lift else 0.0
+                    for support, lift in zip(self.support, self.lift)
+                ])
+            else:
+                column = array('d', [
+                    (1 - confidence / lift) / (1 - confidence) if confidence < 1 and lift else float('inf')
+                    for confidence, lift in zip(self.confidence, self.lift)
+                ])
+            self._metrics[name] = column
+        return column
+
+    def order(self, name: str, descending: bool = True) -> array:
+        key = (name, descending)
+        order = self._orders.get(key)
+        if order is None:
+            column = self.metric(name)
+            order = self._orders[key] = array('l', sorted(range(len(column)), key=column.__getitem__,
+                                                          reverse=descending))
+        return order
+
+    def where(self, rule_ids: Optional[Sequence[int]] = None, **thresholds: float) -> Sequence[int]:
+        selected = range(len(self)) if rule_ids is None else rule_ids
+        for name, threshold in thresholds.items():
+            if not threshold:
+                continue
+            column = self.metric(name)
+            selected = [rule_id for rule_id in selected if column[rule_id] >= threshold]
+        return selected
+
+    def select(self, rule_ids: Iterable[int]) -> 'RuleSet':
+        rule_ids = list(rule_ids)
+        ruleset = RuleSet(self.items)
+        ruleset.itemsets = self.itemsets
+        ruleset.itemset_ids = self.itemset_ids
+        for name in ('antecedents', 'consequents', 'support', 'confidence', 'lift'):
+            column = getattr(self, name)
+            setattr(ruleset, name, array(column.typecode, [column[rule_id] for rule_id in rule_ids]))
+        for name, (low, high) in self.intervals.items():
+            ruleset.intervals[name] = (array('d', [low[rule_id] for rule_id in rule_ids]),
+                                       array('d', [high[rule_id] for rule_id in rule_ids]))
+        return ruleset
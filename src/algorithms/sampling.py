@@ -0,0 +1,273 @@
+import copy
+import math
+import random
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from src.algorithms.candidate_trie import CandidateTrie, generate_candidates
+from src.algorithms.instrumentation import MiningStats
+from src.algorithms.lattice import derive_miner
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.support_index import SupportIndex
+from src.algorithms.transactions import TransactionStore
+
+
+def chernoff_sample_size(epsilon: float, delta: float) -> int:
+    return math.ceil(math.log(2 / delta) / (2 * epsilon ** 2))
+
+
+def chernoff_margin(n: int, delta: float) -> float:
+    if n <= 0:
+        return 1.0
+    return math.sqrt(math.log(2 / delta) / (2 * n))
+
+
+def reservoir_sample(transactions: Iterable[Iterable[str]], size: int,
+                     rng: random.Random) -> Tuple[List[List[str]], int]:
+    reservoir = []
+    n_seen = 0
+    weight = 1.0
+    next_index = size
+
+    for n_seen, transaction in enumerate(transactions, 1):
+        index = n_seen - 1
+        if index < size:
+            reservoir.append(list(transaction))
+            if index == size - 1:
+                weight = math.exp(math.log(1.0 - rng.random()) / size)
+                next_index = size + math.floor(math.log(1.0 - rng.random()) / math.log(1.0 - weight))
+        elif index == next_index:
+            reservoir[rng.randrange(size)] = list(transaction)
+            weight *= math.exp(math.log(1.0 - rng.random()) / size)
+            next_index += math.floor(math.log(1.0 - rng.random()) / math.log(1.0 - weight)) + 1
+
+    return reservoir, n_seen
+
+
+def negative_border(itemsets: Set[Tuple[int, ...]]) -> Set[Tuple[int, ...]]:
+    levels = defaultdict(set)
+    for itemset in itemsets:
+        levels[len(itemset)].add(itemset)
+
+    border = set()
+    for k, level in levels.items():
+        border |= generate_candidates(level, k + 1) - levels.get(k + 1, set())
+    return border
+
+
+class SampledMiner:
+
+    def __init__(self, miner, epsilon: float = 0.01, delta: float = 0.05,
+                 sample_size: Optional[int] = None, verify: bool = False,
+                 seed: Optional[int] = None):
+        if not 0 < epsilon < 1:
+            raise ValueError('epsilon must be between 0 and 1')
+        if not 0 < delta < 1:
+            raise ValueError('delta must be between 0 and 1')
+        if verify and getattr(miner, 'output', 'all') != 'all':
+            raise ValueError("Verification needs a miner with output='all'")
+
+        self.miner = miner
+        self.min_support = miner.min_support
+        self.min_confidence = miner.min_confidence
+        self.output = getattr(miner, 'output', 'all')
+        self.epsilon = epsilon
+        self.delta = delta
+        self.sample_size = sample_size or chernoff_sample_size(epsilon, delta)
+        self.verify = verify
+        self.rng = random.Random(seed)
+        self.transactions = TransactionStore()
+        self.support_index = SupportIndex()
+        self.n_transactions = 0
+        self.n_sampled = 0
+        self.lowered_support = self.min_support
+        self.support_margin = 0.0
+        self.verified = False
+        self.scans = 0
+        self.border_size = 0
+        self.border_misses = 0
+        self.stats = MiningStats(miner.stats.hooks)
+        self.frequent_itemsets = {}
+        self.rules = RuleSet()
+        self.recommendation_index = RecommendationIndex(self.rules)
+        self.execution_time = 0
+
+    def fit(self, transactions: Union[Iterable[List[str]], TransactionStore]) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        if self.verify and iter(transactions) is transactions:
+            raise ValueError('Verification rescans the data, pass a TransactionStore or a list')
+
+        with self.stats.phase('sample'):
+            sample = self._sample(transactions)
+        self.n_sampled = len(sample)
+        exact = self.n_sampled == self.n_transactions
+        self.support_margin = 0.0 if exact else chernoff_margin(self.n_sampled, self.delta)
+        if self.support_margin >= self.min_support:
+            raise ValueError(f'A sample of {self.n_sampled} transactions is too small for '
+                             f'min_support={self.min_support}, increase sample_size or lower epsilon')
+        self.lowered_support = self.min_support - self.support_margin
+        self.verified = exact or self.verify
+        self.scans = 0
+        self.border_size = 0
+        self.border_misses = 0
+
+        sample_miner = copy.copy(self.miner)
+        sample_miner.min_support = self.lowered_support
+        sample_miner.fit(sample)
+        self.stats.merge(sample_miner.stats)
+
+        if exact:
+            result = sample_miner
+        elif self.verify:
+            with self.stats.phase('verify'):
+                result = self._verify(sample_miner, transactions)
+        else:
+            with self.stats.phase('derive'):
+                result = derive_miner(sample_miner, self.min_support, self.min_confidence)
+
+        self.transactions = transactions if isinstance(transactions, TransactionStore) else sample
+        self.support_index = result.support_index
+        self.frequent_itemsets = result.frequent_itemsets
+        self.rules = result.rules
+        self.recommendation_index = result.recommendation_index
+        with self.stats.phase('intervals'):
+            support_intervals = [self._interval(support, self.n_sampled) for support in self.rules.support]
+            confidence_intervals = [
+                self._interval(confidence, round(self.n_sampled * support / confidence))
+                for support, confidence in zip(self.rules.support, self.rules.confidence)
+            ]
+            for name, intervals in (('support_interval', support_intervals),
+                                    ('confidence_interval', confidence_intervals)):
+                self.rules.intervals[name] = (array('d', [low for low, _ in intervals]),
+                                              array('d', [high for _, high in intervals]))
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': sum(len(itemsets) for itemsets in self.frequent_itemsets.values()),
+            'n_transactions': self.n_transactions,
+            'sample_size': self.n_sampled,
+            'lowered_support': self.lowered_support,
+            'support_margin': self.support_margin,
+            'delta': self.delta,
+            'verified': self.verified,
+            'scans': self.scans,
+            'border_size': self.border_size,
+            'border_misses': self.border_misses
+        }
+
+    @property
+    def incremental(self) -> bool:
+        return False
+
+    def update(self, transactions: Optional[List[List[str]]] = None) -> Dict:
+        if transactions is not None:
+            self.transactions.extend(transactions)
+        return self.fit(self.transactions)
+
+    def _sample(self, transactions) -> TransactionStore:
+        if isinstance(transactions, TransactionStore):
+            self.n_transactions = len(transactions)
+            if self.sample_size >= self.n_transactions:
+                return transactions
+            return transactions.subset(sorted(self.rng.sample(range(self.n_transactions), self.sample_size)))
+
+        rows, self.n_transactions = reservoir_sample(transactions, self.sample_size, self.rng)
+        return TransactionStore.from_transactions(rows)
+
+    def _interval(self, estimate: float, n: int) -> Tuple[float, float]:
+        margin = 0.0 if self.verified else chernoff_margin(n, self.delta)
+        return max(0.0, estimate - margin), min(1.0, estimate + margin)
+
+    def _rescan(self, source, store: TransactionStore) -> Iterator[Tuple[int, ...]]:
+        if isinstance(source, TransactionStore):
+            return iter(source)
+        return (tuple(sorted({store.intern(item) for item in transaction})) for transaction in source)
+
+    def _count(self, candidates: Set[Tuple[int, ...]], source, store: TransactionStore,
+               count_items: bool) -> Dict[Tuple[int, ...], int]:
+        levels = defaultdict(list)
+        for itemset in candidates:
+            if len(itemset) > 1:
+                levels[len(itemset)].append(itemset)
+        tries = [CandidateTrie(level, k) for k, level in levels.items()]
+        item_counts = defaultdict(int)
+
+        for transaction in self._rescan(source, store):
+            if count_items:
+                for item_id in transaction:
+                    item_counts[item_id] += 1
+            for trie in tries:
+                trie.count_transaction(transaction)
+
+        counts = {(item_id,): count for item_id, count in item_counts.items()}
+        for trie in tries:
+            counts.update(zip(trie.candidates, trie.counts))
+            self.stats.add(trie.k, 'rescanned', len(trie))
+        self.scans += 1
+        return counts
+
+    def _verify(self, sample_miner, source):
+        store = sample_miner.transactions
+        min_support_count = self.min_support * self.n_transactions
+        sample_frequent = set(sample_miner.support_index)
+        border = negative_border(sample_frequent)
+        self.border_size = len(border)
+
+        counts = {}
+        candidates = sample_frequent | border
+        while True:
+            counts.update(self._count(candidates, source, store, count_items=not self.scans))
+            frequent = {
+                itemset for itemset, count in counts.items()
+                if count and count >= min_support_count
+            }
+            candidates = negative_border(frequent) - counts.keys()
+            if not candidates:
+                break
+
+        self.border_misses = len(border & frequent)
+        self.stats.count('border_misses', self.border_misses)
+
+        result = copy.copy(sample_miner)
+        result.min_support = self.min_support
+        result.stats = self.stats
+        result.support_index = SupportIndex(self.n_transactions)
+        result.frequent_itemsets = {1: {}}
+        for itemset in sorted(frequent, key=len):
+            count = counts[itemset]
+            result.frequent_itemsets.setdefault(len(itemset), {})[itemset] = count / self.n_transactions
+            result.support_index.add(itemset, count)
+
+        result.rules = result._generate_rules()
+        with self.stats.phase('build_index'):
+            result.recommendation_index = RecommendationIndex(result.rules)
+        return result
+
+    def get_support_interval(self, itemset: Iterable[str]) -> Optional[Tuple[float, float]]:
+        encoded = self.transactions.encode(itemset)
+        if encoded is None or encoded not in self.support_index:
+            return None
+        return self._interval(self.support_index.support(encoded), self.n_sampled)
+
+    def get_frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        decode = self.transactions.decode
+        return {
+            k: {decode(itemset): support for itemset, support in itemsets.items()}
+            for k, itemsets in self.frequent_itemsets.items()
+        }
+
+    def get_rules(self) -> List[Dict]:
+        return list(self.rules)
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.get(item, top_n)
+
+    def recommend(self, basket: Iterable[str], top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.recommend(basket, top_n)
@@ -0,0 +1,26 @@
+from typing import Dict, Iterator, Tuple
+
+
+class SupportIndex:
+
+    def __init__(self, n_transactions: int = 0):
+        self.n_transactions = n_transactions
+        self.counts: Dict[Tuple[int, ...], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, itemset: Tuple[int, ...]) -> bool:
+        return itemset in self.counts
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        return iter(self.counts)
+
+    def add(self, itemset: Tuple[int, ...], count: int):
+        self.counts[itemset] = count
+
+    def count(self, itemset: Tuple[int, ...]) -> int:
+        return self.counts[itemset]
+
+    def support(self, itemset: Tuple[int, ...]) -> float:
+        return self.counts[itemset] / self.n_transactions
@@ -0,0 +1,78 @@
+from typing import List, Set, Union
+
+from src.algorithms.transactions import TransactionStore
+
+TIDLIST_MODES = ('set', 'bitset', 'diffset')
+
+Tidlist = Union[Set[int], int]
+
+
+def build_tidsets(store: TransactionStore) -> List[Set[int]]:
+    tid_sets = [set() for _ in range(store.n_items)]
+
+    for tid, transaction in enumerate(store):
+        for item_id in transaction:
+            tid_sets[item_id].add(tid)
+
+    return tid_sets
+
+
+def build_bitsets(store: TransactionStore) -> List[int]:
+    n_bytes = (len(store) + 7) // 8
+    buffers = [bytearray(n_bytes) for _ in range(store.n_items)]
+
+    for tid, transaction in enumerate(store):
+        byte_index = tid >> 3
+        bit = 1 << (tid & 7)
+        for item_id in transaction:
+            buffers[item_id][byte_index] |= bit
+
+    return [int.from_bytes(buffer, 'little') for buffer in buffers]
+
+
+def tidlist_count(tidlist: Tidlist) -> int:
+    if isinstance(tidlist, int):
+        return tidlist.bit_count()
+    return len(tidlist)
+
+
+def tidlist_difference(left: Tidlist, right: Tidlist) -> Tidlist:
+    if isinstance(left, int):
+        return left & ~right
+    return left - right
+
+
+def tidlist_issubset(left: Tidlist, right: Tidlist) -> bool:
+    if isinstance(left, int):
+        return left & right == left
+    return left <= right
+
+
+def append_tidlists(tid_lists: List[Tidlist], store: TransactionStore, start: int, bitsets: bool):
+    while len(tid_lists) < store.n_items:
+        tid_lists.append(0 if bitsets else set())
+
+    if not bitsets:
+        added = {}
+        for tid, transaction in enumerate(store.iter_range(start, len(store)), start):
+            for item_id in transaction:
+                if item_id not in added:
+                    added[item_id] = []
+                added[item_id].append(tid)
+
+        for item_id, tids in added.items():
+            tid_lists[item_id] = tid_lists[item_id].union(tids)
+        return
+
+    n_bytes = (len(store) - start + 7) // 8
+    buffers = {}
+    for offset, transaction in enumerate(store.iter_range(start, len(store))):
+        byte_index = offset >> 3
+        bit = 1 << (offset & 7)
+        for item_id in transaction:
+            if item_id not in buffers:
+                buffers[item_id] = bytearray(n_bytes)
+            buffers[item_id][byte_index] |= bit
+
+    for item_id, buffer in buffers.items():
+        tid_lists[item_id] |= int.from_bytes(buffer, 'little') << start
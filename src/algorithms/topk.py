@@ -0,0 +1,225 @@
+import heapq
+import math
+import time
+from itertools import count as counter
+from typing import List, Dict, Optional, Tuple, Union
+
+from src.algorithms.instrumentation import Hook, MiningStats
+from src.algorithms.recommendations import RecommendationIndex
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.tidlists import build_bitsets, build_tidsets, tidlist_count
+from src.algorithms.transactions import TransactionStore, as_store
+
+TOPK_METRICS = ('confidence', 'lift')
+
+
+class TopKRuleMiner:
+
+    def __init__(self, k: int = 100, metric: str = 'confidence', min_support: float = 0.0,
+                 tidlist: str = 'bitset', hooks: Optional[List[Hook]] = None,
+                 max_expansions: Optional[int] = 50000):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        if max_expansions is not None and max_expansions < 1:
+            raise ValueError('max_expansions must be at least 1')
+        if metric not in TOPK_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {TOPK_METRICS}")
+        if tidlist not in ('set', 'bitset'):
+            raise ValueError(f"Unknown tidlist mode '{tidlist}', expected 'set' or 'bitset'")
+
+        self.k = k
+        self.metric = metric
+        self.min_support = min_support
+        self.tidlist = tidlist
+        self.max_expansions = max_expansions
+        self.transactions = TransactionStore()
+        self.tid_sets = []
+        self.top_rules = []
+        self.rules = RuleSet()
+        self.recommendation_index = RecommendationIndex(self.rules)
+        self.expanded_rules = 0
+        self.complete = True
+        self.stats = MiningStats(hooks)
+        self.execution_time = 0
+
+    def fit(self, transactions: Union[List[List[str]], TransactionStore]) -> Dict:
+        start_time = time.time()
+        self.stats = self.stats.fresh()
+        self.transactions = as_store(transactions)
+        n_transactions = len(self.transactions)
+        min_support_count = max(1, self.min_support * n_transactions)
+
+        with self.stats.phase('build_tidlists'):
+            if self.tidlist == 'set':
+                self.tid_sets = build_tidsets(self.transactions)
+            else:
+                self.tid_sets = build_bitsets(self.transactions)
+
+        self.top_rules = []
+        self.expanded_rules = 0
+        self.complete = True
+        with self.stats.phase('search'):
+            self._search(min_support_count, n_transactions)
+        self.stats.count('expanded_rules', self.expanded_rules)
+        self.stats.end_levels()
+
+        with self.stats.phase('generate_rules'):
+            self.rules = self._decode_rules(n_transactions)
+        self.stats.count('rules', len(self.rules))
+        with self.stats.phase('build_index'):
+            self.recommendation_index = RecommendationIndex(self.rules)
+
+        self.execution_time = (time.time() - start_time) * 1000
+
+        return {
+            'execution_time': self.execution_time,
+            'num_rules': len(self.rules),
+            'num_frequent_itemsets': 0,
+            'expanded_rules': self.expanded_rules,
+            'complete': self.complete,
+            'final_min_support': self._bar()[1] / n_transactions if n_transactions else 0,
+            'final_min_score': self._bar()[0]
+        }
+
+    @property
+    def incremental(self) -> bool:
+        return False
+
+    def update(self, transactions: Optional[List[List[str]]] = None) -> Dict:
+        if transactions is not None:
+            self.transactions.extend(transactions)
+        return self.fit(self.transactions)
+
+    def _bar(self) -> Tuple[float, int]:
+        if len(self.top_rules) < self.k:
+            return 0.0, 0
+        score, support_count = self.top_rules[0][:2]
+        return score, support_count
+
+    def _score(self, support_count: int, antecedent_count: int, consequent_count: int,
+               n_transactions: int) -> float:
+        if self.metric == 'confidence':
+            return support_count / antecedent_count
+        return support_count * n_transactions / (antecedent_count * consequent_count)
+
+    def _offer(self, antecedent: Tuple[int, ...], consequent: Tuple[int, ...],
+               support_count: int, antecedent_count: int, consequent_count: int,
+               n_transactions: int, sequence: int):
+        score = self._score(support_count, antecedent_count, consequent_count, n_transactions)
+        entry = (score, support_count, -sequence, antecedent, consequent,
+                 antecedent_count, consequent_count)
+
+        if len(self.top_rules) < self.k:
+            heapq.heappush(self.top_rules, entry)
+        elif entry[:2] > self.top_rules[0][:2]:
+            heapq.heapreplace(self.top_rules, entry)
+
+    def _expansions(self, support_count: int, antecedent_count: int, min_support_count: float,
+                    n_transactions: int, expand_left: bool) -> Tuple[bool, bool]:
+        bar = self._bar()
+        if self.metric == 'confidence':
+            left_bound = (1.0, support_count)
+            right_bound = (support_count / antecedent_count, support_count)
+        else:
+            floor_count = max(1, math.ceil(min_support_count))
+            left_bound = (n_transactions / floor_count, min(support_count, floor_count))
+            right_bound = (n_transactions / antecedent_count, min(support_count, antecedent_count))
+
+        return expand_left and left_bound > bar, right_bound > bar
+
+    def _search(self, min_support_count: float, n_transactions: int):
+        frequent = [
+            item_id for item_id, tid_set in enumerate(self.tid_sets)
+            if tidlist_count(tid_set) >= min_support_count
+        ]
+        item_counts = {item_id: tidlist_count(self.tid_sets[item_id]) for item_id in frequent}
+
+        sequence = counter()
+        frontier = []
+
+        def push(antecedent, consequent, tid_rule, tid_antecedent, tid_consequent,
+                 support_count, antecedent_count, consequent_count, expand_left):
+            order = next(sequence)
+            self.stats.add(len(antecedent) + len(consequent), 'candidates')
+            self._offer(antecedent, consequent, support_count, antecedent_count, consequent_count,
+                        n_transactions, order)
+            if not any(self._expansions(support_count, antecedent_count, min_support_count,
+                                        n_transactions, expand_left)):
+                return
+            if self.metric == 'confidence':
+                priority = -support_count
+            else:
+                priority = -self._score(support_count, antecedent_count, consequent_count,
+                                        n_transactions)
+            heapq.heappush(frontier, (priority, order, support_count, antecedent, consequent,
+                                      tid_rule, tid_antecedent, tid_consequent, antecedent_count,
+                                      consequent_count, expand_left))
+
+        for position, item_i in enumerate(frequent):
+            for item_j in frequent[position + 1:]:
+                tid_rule = self.tid_sets[item_i] & self.tid_sets[item_j]
+                support_count = tidlist_count(tid_rule)
+                if support_count < min_support_count:
+                    continue
+
+                push((item_i,), (item_j,), tid_rule, self.tid_sets[item_i], self.tid_sets[item_j],
+                     support_count, item_counts[item_i], item_counts[item_j], True)
+                push((item_j,), (item_i,), tid_rule, self.tid_sets[item_j], self.tid_sets[item_i],
+                     support_count, item_counts[item_j], item_counts[item_i], True)
+
+        while frontier:
+            if self.max_expansions is not None and self.expanded_rules >= self.max_expansions:
+                self.complete = False
+                break
+
+            (_, _, support_count, antecedent, consequent, tid_rule, tid_antecedent, tid_consequent,
+             antecedent_count, consequent_count, expand_left) = heapq.heappop(frontier)
+            expand_left, expand_right = self._expansions(support_count, antecedent_count,
+                                                         min_support_count, n_transactions,
+                                                         expand_left)
+            if not expand_left and not expand_right:
+                continue
+
+            self.expanded_rules += 1
+
+            for item in frequent:
+                if item in antecedent or item in consequent:
+                    continue
+
+                if expand_left and item > antecedent[-1]:
+                    tid_new = tid_rule & self.tid_sets[item]
+                    new_count = tidlist_count(tid_new)
+                    if new_count >= min_support_count:
+                        tid_new_antecedent = tid_antecedent & self.tid_sets[item]
+                        push(antecedent + (item,), consequent, tid_new, tid_new_antecedent,
+                             tid_consequent, new_count, tidlist_count(tid_new_antecedent),
+                             consequent_count, True)
+
+                if expand_right and item > consequent[-1]:
+                    tid_new = tid_rule & self.tid_sets[item]
+                    new_count = tidlist_count(tid_new)
+                    if new_count >= min_support_count:
+                        tid_new_consequent = tid_consequent & self.tid_sets[item]
+                        push(antecedent, consequent + (item,), tid_new, tid_antecedent,
+                             tid_new_consequent, new_count, antecedent_count,
+                             tidlist_count(tid_new_consequent), False)
+
+    def _decode_rules(self, n_transactions: int) -> RuleSet:
+        rules = RuleSet(self.transactions.items)
+
+        for (score, support_count, _, antecedent, consequent,
+             antecedent_count, consequent_count) in sorted(self.top_rules, reverse=True):
+            confidence = support_count / antecedent_count
+            rules.add(antecedent, consequent, support_count / n_transactions, confidence,
+                      confidence / (consequent_count / n_transactions))
+
+        return rules
+
+    def get_rules(self) -> List[Dict]:
+        return list(self.rules)
+
+    def get_recommendations(self, item: str, top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.get(item, top_n)
+
+    def recommend(self, basket: List[str], top_n: Optional[int] = None) -> List[Dict]:
+        return self.recommendation_index.recommend(basket, top_n)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class TransactionStore:
+
+    def __init__(self):
+        self.item_ids: Dict[str, int] = {}
+        self.items: List[str] = []
+        self.offsets = array('q', [0])
+        self.indices = array('l')
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Iterable[str]]) -> 'TransactionStore':
+        store = cls()
+        store.extend(transactions)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, tid: int) -> Tuple[int, ...]:
+        return tuple(self.indices[self.offsets[tid]:self.offsets[tid + 1]])
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        return self.iter_range(0, len(self))
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, ...]]:
+        indices = self.indices
+        offsets = self.offsets
+        for tid in range(start, stop):
+            yield tuple(indices[offsets[tid]:offsets[tid + 1]])
+
+    def copy(self) -> 'TransactionStore':
+        store = TransactionStore()
+        store.item_ids = dict(self.item_ids)
+        store.items = list(self.items)
+        store.offsets = array('q', self.offsets)
+        store.indices = array('l', self.indices)
+        return store
+
+    def snapshot(self) -> 'StoreSnapshot':
+        return StoreSnapshot(self)
+
+    def subset(self, tids: Iterable[int]) -> 'TransactionStore':
+        store = TransactionStore()
+        store.item_ids = dict(self.item_ids)
+        store.items = list(self.items)
+        for tid in tids:
+            store.indices.extend(self.indices[self.offsets[tid]:self.offsets[tid + 1]])
+            store.offsets.append(len(store.indices))
+        return store
+
+    @property
+    def n_items(self) -> int:
+        return len(self.items)
+
+    def intern(self, item: str) -> int:
+        item_id = self.item_ids.get(item)
+        if item_id is None:
+            item_id = len(self.items)
+            self.item_ids[item] = item_id
+            self.items.append(item)
+        return item_id
+
+    def append(self, transaction: Iterable[str]) -> int:
+        self.indices.extend(sorted({self.intern(item) for item in transaction}))
+        self.offsets.append(len(self.indices))
+        return len(self.offsets) - 2
+
+    def extend(self, transactions: Iterable[Iterable[str]]):
+        for transaction in transactions:
+            self.append(transaction)
+
+    def item_counts(self) -> List[int]:
+        counts = [0] * len(self.items)
+        for item_id in self.indices:
+            counts[item_id] += 1
+        return counts
+
+    def encode(self, itemset: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        ids = []
+        for item in itemset:
+            item_id = self.item_ids.get(item)
+            if item_id is None:
+                return None
+            ids.append(item_id)
+        return tuple(sorted(set(ids)))
+
+    def decode(self, itemset: Iterable[int]) -> frozenset:
+        return frozenset(self.items[item_id] for item_id in itemset)
+
+    def fingerprint(self) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps(self.items).encode('utf-8'))
+        digest.update(self.offsets.tobytes())
+        digest.update(self.indices.tobytes())
+        return digest.hexdigest()
+
+    def count(self, itemset: Tuple[int, ...]) -> int:
+        needed = set(itemset)
+        return sum(1 for transaction in self if needed.issubset(transaction))
+
+
+class StoreSnapshot(TransactionStore):
+
+    def __init__(self, store: TransactionStore):
+        self.item_ids = store.item_ids
+        self.items = store.items
+        self.offsets = store.offsets
+        self.indices = store.indices
+        self.length = len(store)
+        self._n_items = store.n_items
+
+    def __reduce__(self):
+        return StoreSnapshot, (self.copy(),)
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def n_items(self) -> int:
+        return self._n_items
+
+    def snapshot(self) -> 'StoreSnapshot':
+        return self
+
+    def copy(self) -> TransactionStore:
+        store = TransactionStore()
+        store.items = self.items[:self._n_items]
+        store.item_ids = {item: item_id for item_id, item in enumerate(store.items)}
+        store.offsets = self.offsets[:self.length + 1]
+        store.indices = self.indices[:self.offsets[self.length]]
+        return store
+
+    def subset(self, tids: Iterable[int]) -> TransactionStore:
+        store = super().subset(tids)
+        store.items = store.items[:self._n_items]
+        store.item_ids = {item: item_id for item_id, item in enumerate(store.items)}
+        return store
+
+    def intern(self, item: str) -> int:
+        raise TypeError('Store snapshots are read-only')
+
+    def append(self, transaction: Iterable[str]) -> int:
+        raise TypeError('Store snapshots are read-only')
+
+    def item_counts(self) -> List[int]:
+        counts = [0] * self._n_items
+        for item_id in self.indices[:self.offsets[self.length]]:
+            counts[item_id] += 1
+        return counts
+
+    def encode(self, itemset: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        encoded = super().encode(itemset)
+        if encoded is None or (encoded and encoded[-1] >= self._n_items):
+            return None
+        return encoded
+
+    def fingerprint(self) -> str:
+        return self.copy().fingerprint()
+
+
+def as_store(transactions) -> TransactionStore:
+    if isinstance(transactions, TransactionStore):
+        return transactions
+    return TransactionStore.from_transactions(transactions)
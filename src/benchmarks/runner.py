@@ -0,0 +1,168 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.algorithms.apriori import AprioriMiner
+from src.algorithms.eclat import EclatMiner
+from src.algorithms.fpgrowth import FPGrowthMiner
+from src.algorithms.transactions import TransactionStore
+from src.benchmarks.synthetic import QuestGenerator
+
+ENGINES: Dict[str, Callable] = {
+    'apriori': lambda min_support, min_confidence: AprioriMiner(min_support, min_confidence),
+    'eclat': lambda min_support, min_confidence: EclatMiner(min_support, min_confidence, 'set'),
+    'eclat-bitset': lambda min_support, min_confidence: EclatMiner(min_support, min_confidence, 'bitset'),
+    'eclat-diffset': lambda min_support, min_confidence: EclatMiner(min_support, min_confidence, 'diffset'),
+    'fpgrowth': lambda min_support, min_confidence: FPGrowthMiner(min_support, min_confidence)
+}
+
+FIELDS = [
+    'dataset', 'n_transactions', 'avg_transaction_length', 'n_items', 'engine', 'min_support',
+    'min_confidence', 'wall_time_ms', 'rss_before_kb', 'peak_rss_kb', 'num_candidates',
+    'num_frequent_itemsets', 'num_rules'
+]
+
+
+def _max_rss_kb() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def _measure(engine: str, store: TransactionStore, min_support: float, min_confidence: float) -> Dict:
+    miner = ENGINES[engine](min_support, min_confidence)
+    rss_before = _max_rss_kb()
+
+    start_time = time.perf_counter()
+    metrics = miner.fit(store)
+    wall_time = (time.perf_counter() - start_time) * 1000
+
+    return {
+        'wall_time_ms': wall_time,
+        'rss_before_kb': rss_before,
+        'peak_rss_kb': _max_rss_kb(),
+        'num_candidates': miner.stats.total('candidates'),
+        'num_frequent_itemsets': metrics['num_frequent_itemsets'],
+        'num_rules': metrics['num_rules'],
+        'phases': miner.stats.phases
+    }
+
+
+def _measure_child(connection, engine: str, store: TransactionStore, min_support: float,
+                   min_confidence: float):
+    try:
+        connection.send(_measure(engine, store, min_support, min_confidence))
+    except Exception as e:
+        connection.send({'error': str(e)})
+    finally:
+        connection.close()
+
+
+def _measure_isolated(engine: str, store: TransactionStore, min_support: float,
+                      min_confidence: float) -> Dict:
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_child,
+                              args=(sender, engine, store, min_support, min_confidence))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+
+    if 'error' in result:
+        raise RuntimeError(f"{engine} failed at min_support={min_support}: {result['error']}")
+    return result
+
+
+def run_benchmark(datasets: Dict[str, QuestGenerator], supports: Iterable[float],
+                  engines: Iterable[str] = tuple(ENGINES), min_confidence: float = 0.5,
+                  isolate: bool = True,
+                  progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    engines = list(engines)
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {tuple(ENGINES)}")
+
+    isolate = isolate and 'fork' in multiprocessing.get_all_start_methods()
+    measure = _measure_isolated if isolate else _measure
+    records = []
+
+    for name, generator in datasets.items():
+        store = TransactionStore.from_transactions(generator.iter_transactions())
+
+        for min_support in sorted(supports, reverse=True):
+            for engine in engines:
+                record = {
+                    'dataset': name,
+                    'n_transactions': len(store),
+                    'avg_transaction_length': generator.avg_transaction_length,
+                    'n_items': generator.n_items,
+                    'engine': engine,
+                    'min_support': min_support,
+                    'min_confidence': min_confidence
+                }
+                record.update(measure(engine, store, min_support, min_confidence))
+                records.append(record)
+
+                if progress is not None:
+                    progress(record)
+
+    return records
+
+
+def write_json(records: List[Dict], filepath: str):
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2)
+
+
+def write_csv(records: List[Dict], filepath: str):
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark the miners on synthetic basket data')
+    parser.add_argument('--transactions', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--avg-length', type=float, default=10)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--patterns', type=int, default=2000)
+    parser.add_argument('--pattern-length', type=float, default=4)
+    parser.add_argument('--supports', type=float, nargs='+', default=[0.05, 0.02, 0.01])
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path')
+    parser.add_argument('--csv', dest='csv_path')
+    parser.add_argument('--no-isolate', action='store_true')
+    args = parser.parse_args(argv)
+
+    datasets = {
+        f'T{args.avg_length:g}I{args.pattern_length:g}D{n_transactions}': QuestGenerator(
+            n_transactions, args.avg_length, args.items, args.patterns, args.pattern_length,
+            seed=args.seed
+        )
+        for n_transactions in args.transactions
+    }
+
+    def report(record: Dict):
+        print(f"{record['dataset']:<16} {record['engine']:<14} s={record['min_support']:<8g} "
+              f"{record['wall_time_ms']:>10.1f} ms {record['peak_rss_kb']:>9d} KB "
+              f"{record['num_candidates']:>9d} cand {record['num_frequent_itemsets']:>8d} itemsets")
+
+    records = run_benchmark(datasets, args.supports, args.engines, args.min_confidence,
+                            not args.no_isolate, report)
+
+    if args.json_path:
+        write_json(records, args.json_path)
+    if args.csv_path:
+        write_csv(records, args.csv_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import math
+import random
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+
+    limit = math.exp(-mean)
+    value = 0
+    product = rng.random()
+    while product > limit:
+        value += 1
+        product *= rng.random()
+    return value
+
+
+class QuestGenerator:
+
+    def __init__(self, n_transactions: int = 10000, avg_transaction_length: float = 10,
+                 n_items: int = 1000, n_patterns: int = 2000, avg_pattern_length: float = 4,
+                 correlation: float = 0.5, corruption: float = 0.5, seed: Optional[int] = 0):
+        if n_items < 1:
+            raise ValueError('n_items must be at least 1')
+        if n_patterns < 1:
+            raise ValueError('n_patterns must be at least 1')
+
+        self.n_transactions = n_transactions
+        self.avg_transaction_length = avg_transaction_length
+        self.n_items = n_items
+        self.n_patterns = n_patterns
+        self.avg_pattern_length = avg_pattern_length
+        self.correlation = correlation
+        self.corruption = corruption
+        self.seed = seed
+        self.item_names = [f'item{item_id}' for item_id in range(n_items)]
+
+    def _patterns(self, rng: random.Random) -> Tuple[List[List[int]], List[float], List[float]]:
+        patterns = []
+        previous = []
+
+        for _ in range(self.n_patterns):
+            size = min(self.n_items, max(1, _poisson(rng, self.avg_pattern_length)))
+
+            fraction = min(1.0, rng.expovariate(1 / self.correlation)) if self.correlation > 0 else 0.0
+            reused = min(len(previous), int(fraction * size))
+            pattern = set(rng.sample(previous, reused)) if reused else set()
+            while len(pattern) < size:
+                pattern.add(rng.randrange(self.n_items))
+
+            previous = sorted(pattern)
+            patterns.append(previous)
+
+        weights = list(accumulate(rng.expovariate(1) for _ in patterns))
+        corruption = [min(0.99, max(0.0, rng.gauss(self.corruption, 0.1))) for _ in patterns]
+
+        return patterns, weights, corruption
+
+    def iter_transactions(self) -> Iterator[List[str]]:
+        rng = random.Random(self.seed)
+        patterns, weights, corruption = self._patterns(rng)
+        pattern_ids = range(len(patterns))
+        n_reachable = len(set().union(*patterns))
+        pending = None
+
+        for _ in range(self.n_transactions):
+            size = min(n_reachable, max(1, _poisson(rng, self.avg_transaction_length)))
+            transaction = set()
+
+            while len(transaction) < size:
+                if pending is not None:
+                    pattern_id, pending = pending, None
+                else:
+                    pattern_id = rng.choices(pattern_ids, cum_weights=weights)[0]
+
+                items = list(patterns[pattern_id])
+                while items and rng.random() < corruption[pattern_id]:
+                    items.pop(rng.randrange(len(items)))
+                if not items:
+                    continue
+
+                if transaction and len(transaction) + len(items) > size and rng.random() < 0.5:
+                    pending = pattern_id
+                    break
+
+                transaction.update(items)
+
+            yield [self.item_names[item] for item in sorted(transaction)]
+
+    def generate(self) -> List[List[str]]:
+        return list(self.iter_transactions())
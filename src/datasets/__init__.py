@@ -0,0 +1 @@
+# Datasets package
@@ -0,0 +1,380 @@
+import copy
+import heapq
+import re
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from src.algorithms.rule_catalog import RuleCatalog
+from src.algorithms.ruleset import RuleSet
+from src.algorithms.transactions import StoreSnapshot, TransactionStore
+
+DEFAULT_DATASET = 'default'
+DATASET_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class DatasetError(Exception):
+    status = 400
+
+
+class UnknownDataset(DatasetError):
+    status = 404
+
+
+class ReadWriteLock:
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+def fork_miner(miner):
+    forked = copy.copy(miner)
+    support_index = getattr(miner, 'support_index', None)
+    if support_index is not None:
+        forked.support_index = copy.copy(support_index)
+    tid_sets = getattr(miner, 'tid_sets', None)
+    if tid_sets is not None:
+        forked.tid_sets = list(tid_sets)
+    return forked
+
+
+class Snapshot:
+
+    def __init__(self, miners: Optional[Dict] = None, store: Optional[TransactionStore] = None,
+                 version: int = 0, length: int = 0):
+        self.miners = {name: miner for name, miner in (miners or {}).items() if miner is not None}
+        self.store = store
+        self.version = version
+        self.length = length
+        self.recommendations: Dict[str, List[Dict]] = {}
+        self.catalogs: Dict[str, RuleCatalog] = {}
+        self.lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.miners)
+
+    def updatable(self) -> Dict:
+        return {name: miner for name, miner in self.miners.items() if name != 'model'}
+
+    def catalog(self, name: str) -> RuleCatalog:
+        with self.lock:
+            catalog = self.catalogs.get(name)
+            if catalog is None:
+                miner = self.miners[name]
+                rules = getattr(miner, 'rules', None)
+                if not isinstance(rules, RuleSet):
+                    rules = RuleSet.from_rules(miner.get_rules())
+                catalog = self.catalogs[name] = RuleCatalog(rules)
+        return catalog
+
+
+class DatasetStats:
+
+    def __init__(self):
+        self.raw_transactions = 0
+        self.cleaned_transactions = 0
+        self.total_items = 0
+        self.item_counts = array('q')
+
+    def reset_cleaned(self):
+        self.cleaned_transactions = 0
+        self.total_items = 0
+        self.item_counts = array('q')
+
+    def count_cleaned(self, store: TransactionStore, start: int):
+        item_counts = self.item_counts
+        if len(item_counts) < store.n_items:
+            item_counts.extend([0] * (store.n_items - len(item_counts)))
+
+        new_items = store.indices[store.offsets[start]:store.offsets[len(store)]]
+        for item_id in new_items:
+            item_counts[item_id] += 1
+        self.total_items += len(new_items)
+        self.cleaned_transactions = len(store)
+
+    def to_dict(self, items: List[str], top_n: int = 10) -> Dict:
+        counts = self.item_counts
+        top = heapq.nlargest(top_n, range(len(counts)), key=counts.__getitem__)
+        return {
+            'total_raw_transactions': self.raw_transactions,
+            'total_cleaned_transactions': self.cleaned_transactions,
+            'unique_items': sum(1 for count in counts if count),
+            'total_items': self.total_items,
+            'avg_items_per_transaction': (self.total_items / self.cleaned_transactions
+                                          if self.cleaned_transactions else 0.0),
+            'top_items': [{'item': items[item_id], 'count': counts[item_id]}
+                          for item_id in top if counts[item_id]]
+        }
+
+
+class Dataset:
+
+    def __init__(self, name: str, batch_size: int = 100, max_delay: float = 1.0):
+        self.name = name
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.lock = ReadWriteLock()
+        self.update_lock = threading.Lock()
+        self.updating = False
+        self.timer: Optional[threading.Timer] = None
+        self.raw_transactions: List[List[str]] = []
+        self.raw_retained = True
+        self.store = TransactionStore()
+        self.report: Dict = {}
+        self.stats = DatasetStats()
+        self.snapshot = Snapshot()
+        self.stale: FrozenSet[str] = frozenset()
+
+    def set_raw(self, transactions: List[List[str]]):
+        with self.lock.write():
+            self.raw_transactions = transactions
+            self.raw_retained = True
+            self.stats.raw_transactions = len(transactions)
+
+    def raw_page(self, offset: int, limit: int) -> Tuple[List[List[str]], int]:
+        with self.lock.read():
+            return self.raw_transactions[offset:offset + limit], self.stats.raw_transactions
+
+    def raw_copy(self) -> List[List[str]]:
+        with self.lock.read():
+            return list(self.raw_transactions)
+
+    def set_store(self, store: TransactionStore, report: Dict, raw_retained: bool = True):
+        with self.lock.write():
+            if not raw_retained:
+                self.raw_transactions = []
+                self.raw_retained = False
+                self.stats.raw_transactions = report['total_transactions']
+            self.store = store
+            self.report = report
+            self.stats.reset_cleaned()
+            self.stats.count_cleaned(store, 0)
+
+    def append(self, transactions: List[List[str]], cleaned: List[List[str]]) -> Dict:
+        with self.lock.write():
+            if self.raw_retained:
+                self.raw_transactions.extend(transactions)
+            self.stats.raw_transactions += len(transactions)
+
+            live = self._live_miners()
+            stored = bool(cleaned) and (bool(live) or not self.raw_retained)
+            if stored:
+                start = len(self.store)
+                self.store.extend(cleaned)
+                self.stats.count_cleaned(self.store, start)
+                self.stale |= {name for name, miner in live.items() if not miner.incremental}
+            pending = self._pending()
+            stale = self._stale()
+
+        if pending:
+            self._schedule(pending)
+        return {'stored': stored, 'pending_updates': pending, 'stale': stale}
+
+    def _live_miners(self) -> Dict:
+        snapshot = self.snapshot
+        return snapshot.updatable() if snapshot.store is self.store else {}
+
+    def _incremental_miners(self) -> Dict:
+        return {name: miner for name, miner in self._live_miners().items() if miner.incremental}
+
+    def _pending(self) -> int:
+        return len(self.store) - self.snapshot.length if self._incremental_miners() else 0
+
+    def _stale(self) -> List[str]:
+        return sorted(self.stale.intersection(self._live_miners()))
+
+    def pending_updates(self) -> int:
+        with self.lock.read():
+            return self._pending()
+
+    def _schedule(self, pending: int):
+        with self.update_lock:
+            if self.updating:
+                return
+            if pending < self.batch_size and self.max_delay > 0:
+                if self.timer is None:
+                    self.timer = threading.Timer(self.max_delay, self._flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.updating = True
+        threading.Thread(target=self._run_updates, daemon=True).start()
+
+    def _flush(self):
+        with self.update_lock:
+            self.timer = None
+            if self.updating:
+                return
+            self.updating = True
+        self._run_updates()
+
+    def _run_updates(self):
+        try:
+            while self.apply_pending():
+                pass
+        except Exception as e:
+            print(f"Warning: updating dataset '{self.name}' failed: {e}")
+            with self.update_lock:
+                self.updating = False
+            return
+
+        with self.update_lock:
+            self.updating = False
+        pending = self.pending_updates()
+        if pending:
+            self._schedule(pending)
+
+    def apply_pending(self) -> bool:
+        with self.lock.read():
+            snapshot = self.snapshot
+            store = self.store
+            miners = self._incremental_miners()
+            view = store.snapshot()
+        if not miners or len(view) <= snapshot.length:
+            return False
+
+        miners = {name: fork_miner(miner) for name, miner in miners.items()}
+        for miner in miners.values():
+            miner.transactions = view
+            miner.update()
+            miner.transactions = store
+
+        with self.lock.write():
+            if self.snapshot is not snapshot:
+                return False
+            self.snapshot = Snapshot({**snapshot.miners, **miners}, store, snapshot.version + 1,
+                                     len(view))
+        return True
+
+    def snapshot_store(self) -> Tuple[TransactionStore, StoreSnapshot]:
+        with self.lock.read():
+            return self.store, self.store.snapshot()
+
+    def install(self, miners: Dict, store: TransactionStore, source: TransactionStore) -> bool:
+        miners = {name: copy.copy(miner) for name, miner in miners.items()}
+        for miner in miners.values():
+            miner.transactions = source
+
+        with self.lock.write():
+            if source is not self.store:
+                return False
+
+            self.snapshot = Snapshot(miners, self.store, self.snapshot.version + 1, len(store))
+            self.stale = frozenset(name for name, miner in miners.items()
+                                   if not miner.incremental and len(store) < len(self.store))
+            pending = self._pending()
+
+        if pending:
+            self._schedule(pending)
+        return True
+
+    def install_model(self, model):
+        with self.lock.write():
+            snapshot = self.snapshot
+            self.snapshot = Snapshot({**snapshot.miners, 'model': model}, snapshot.store,
+                                     snapshot.version + 1, snapshot.length)
+
+    def to_dict(self) -> Dict:
+        with self.lock.read():
+            stats = self.stats.to_dict(self.store.items)
+            snapshot = self.snapshot
+            stats.update({
+                'dataset': self.name,
+                'raw_retained': self.raw_retained,
+                'preprocessing_done': len(self.store) > 0,
+                'mining_done': bool(snapshot),
+                'model_loaded': 'model' in snapshot.miners,
+                'version': snapshot.version,
+                'pending_updates': self._pending(),
+                'stale_miners': self._stale()
+            })
+        return stats
+
+
+class DatasetRegistry:
+
+    def __init__(self, max_datasets: int = 16, batch_size: int = 100, max_delay: float = 1.0):
+        if max_datasets < 1:
+            raise ValueError('max_datasets must be at least 1')
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+
+        self.max_datasets = max_datasets
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.datasets: Dict[str, Dataset] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.datasets)
+
+    def names(self) -> List[str]:
+        with self.lock:
+            return list(self.datasets)
+
+    def values(self) -> List[Dataset]:
+        with self.lock:
+            return list(self.datasets.values())
+
+    def get(self, name: str) -> Dataset:
+        with self.lock:
+            dataset = self.datasets.get(name)
+        if dataset is None:
+            raise UnknownDataset(f"Unknown dataset '{name}'")
+        return dataset
+
+    def create(self, name: str) -> Dataset:
+        if not DATASET_NAME.match(name):
+            raise DatasetError('Dataset names may only contain letters, digits, _ and - (at most 64)')
+
+        with self.lock:
+            dataset = self.datasets.get(name)
+            if dataset is None:
+                if len(self.datasets) >= self.max_datasets:
+                    raise DatasetError(f'At most {self.max_datasets} datasets can be served')
+                dataset = self.datasets[name] = Dataset(name, self.batch_size, self.max_delay)
+        return dataset
+
+    def remove(self, name: str) -> Dataset:
+        with self.lock:
+            dataset = self.datasets.pop(name, None)
+        if dataset is None:
+            raise UnknownDataset(f"Unknown dataset '{name}'")
+        return dataset
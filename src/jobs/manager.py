@@ -0,0 +1,162 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from queue import Queue
+from typing import Callable, Dict, List, Optional, Tuple
+
+JOB_STATES = ('queued', 'running', 'done', 'failed', 'cancelled')
+FINISHED_STATES = ('done', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+
+    def __init__(self, target: Callable[['Job'], Dict], max_events: int = 1000):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.max_events = max_events
+        self.status = 'queued'
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict] = []
+        self.dropped_events = 0
+        self.progress: Dict = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = threading.Event()
+        self.condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def hook(self, event: str, payload: Dict):
+        if self.cancel_requested.is_set():
+            raise JobCancelled(self.id)
+
+        record = {'time': time.time(), 'event': event, **payload}
+        with self.condition:
+            if event in ('level', 'progress'):
+                self.progress = record
+            self.events.append(record)
+            if len(self.events) > self.max_events:
+                overflow = len(self.events) - self.max_events
+                del self.events[:overflow]
+                self.dropped_events += overflow
+            self.condition.notify_all()
+
+    def events_since(self, index: int, timeout: Optional[float] = None) -> Tuple[List[Dict], int, bool]:
+        with self.condition:
+            if index >= self.dropped_events + len(self.events) and not self.finished:
+                self.condition.wait(timeout)
+
+            start = max(0, index - self.dropped_events)
+            events = self.events[start:]
+            return events, self.dropped_events + len(self.events), self.finished
+
+    def _set_status(self, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self.condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            if status == 'running':
+                self.started_at = time.time()
+            elif status in FINISHED_STATES:
+                self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def to_dict(self) -> Dict:
+        with self.condition:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'events': self.dropped_events + len(self.events),
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 16, max_finished: int = 100):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+
+        self.max_finished = max_finished
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self.queue: Queue = Queue(maxsize=max_queued)
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self.workers = [
+            threading.Thread(target=self._work, name=f'mining-job-{index}', daemon=True)
+            for index in range(max_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, target: Callable[[Job], Dict]) -> Job:
+        job = Job(target)
+        with self.lock:
+            self.queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._forget_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+
+        job.cancel_requested.set()
+        with job.condition:
+            if job.status == 'queued':
+                job._set_status('cancelled')
+        return True
+
+    def hook(self, event: str, payload: Dict):
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.hook(event, payload)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job.cancel_requested.is_set():
+                    continue
+                self._run(job)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job: Job):
+        self._local.job = job
+        job._set_status('running')
+        try:
+            result = job.target(job)
+        except JobCancelled:
+            job._set_status('cancelled')
+        except Exception as e:
+            job._set_status('failed', error=str(e))
+        else:
+            job._set_status('done', result=result)
+        finally:
+            self._local.job = None
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
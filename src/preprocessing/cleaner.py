@@ -1,11 +1,16 @@
 import csv
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Iterable, Iterator, Optional
+
+from src.algorithms.transactions import TransactionStore
+
+ITEM_CACHE_LIMIT = 100000
 
 
 class DataCleaner:
 
     def __init__(self, products_file: str = 'data/products.csv'):
         self.valid_products = self._load_valid_products(products_file)
+        self._item_cache: Dict[str, Tuple[str, bool, bool, bool]] = {}
         self.report = {
             'total_transactions': 0,
             'empty_transactions': 0,
@@ -31,70 +36,115 @@ class DataCleaner:
         return products
 
     def load_transactions(self, filepath: str) -> List[List[str]]:
-        transactions = []
+        return list(self.iter_transactions(filepath))
+
+    def iter_transactions(self, filepath: str) -> Iterator[List[str]]:
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    items_str = row.get('items', '').strip()
-                    if items_str:
-                        items = [item.strip() for item in items_str.split(',')]
-                        transactions.append(items)
-                    else:
-                        transactions.append([])
+                yield from self.read_transactions(f)
         except FileNotFoundError:
             print(f"Error: Transaction file {filepath} not found.")
-        return transactions
+
+    def read_transactions(self, lines: Iterable[str]) -> Iterator[List[str]]:
+        reader = csv.DictReader(lines)
+        for row in reader:
+            items_str = (row.get('items') or '').strip()
+            if items_str:
+                yield [item.strip() for item in items_str.split(',')]
+            else:
+                yield []
 
     def preprocess(self, transactions: List[List[str]]) -> Tuple[List[List[str]], Dict]:
-        self.report['total_transactions'] = len(transactions)
         cleaned_transactions = []
+        for chunk in self.preprocess_chunks(transactions):
+            cleaned_transactions.extend(chunk)
+
+        return cleaned_transactions, self.report
+
+    def preprocess_chunks(self, transactions: Iterable[List[str]],
+                          chunk_size: int = 10000) -> Iterator[List[List[str]]]:
+        unique = set()
+        chunk = []
 
         for transaction in transactions:
-            if not transaction or len(transaction) == 0:
-                self.report['empty_transactions'] += 1
+            self.report['total_transactions'] += 1
+            cleaned_items = self._clean_transaction(transaction)
+            if cleaned_items is None:
                 continue
 
-            cleaned_items = []
-            seen_items = set()
-
-            for item in transaction:
-                item = item.strip()
-                if item != transaction[transaction.index(item)].strip():
-                    self.report['whitespace_cleaned'] += 1
+            self.report['valid_transactions'] += 1
+            self.report['total_items'] += len(cleaned_items)
+            unique.update(cleaned_items)
+            chunk.append(cleaned_items)
 
-                original_item = item
-                item = item.lower()
-                if original_item != item:
-                    self.report['case_standardized'] += 1
+            if len(chunk) >= chunk_size:
+                self.report['unique_products'] = len(unique)
+                yield chunk
+                chunk = []
 
-                if self.valid_products and item not in self.valid_products:
-                    self.report['invalid_items'] += 1
-                    continue
+        self.report['unique_products'] = len(unique)
+        if chunk:
+            yield chunk
+
+    def preprocess_to_store(self, transactions: Iterable[List[str]],
+                            chunk_size: int = 10000) -> Tuple[TransactionStore, Dict]:
+        store = TransactionStore()
+        for chunk in self.preprocess_chunks(transactions, chunk_size):
+            store.extend(chunk)
+
+        return store, self.report
+
+    def _clean_transaction(self, transaction: List[str]) -> Optional[List[str]]:
+        if not transaction:
+            self.report['empty_transactions'] += 1
+            return None
+
+        cleaned_items = []
+        seen_items = set()
+        whitespace_cleaned = case_standardized = invalid_items = duplicate_items = 0
+        normalize = self._normalize_item
+
+        for raw_item in transaction:
+            item, whitespace_changed, case_changed, valid = normalize(raw_item)
+            whitespace_cleaned += whitespace_changed
+            case_standardized += case_changed
+
+            if not valid:
+                invalid_items += 1
+                continue
 
-                if item in seen_items:
-                    self.report['duplicate_items'] += 1
-                    continue
+            if item in seen_items:
+                duplicate_items += 1
+                continue
 
-                seen_items.add(item)
-                cleaned_items.append(item)
+            seen_items.add(item)
+            cleaned_items.append(item)
 
-            if len(cleaned_items) == 1:
-                self.report['single_item_transactions'] += 1
-                continue
+        report = self.report
+        report['whitespace_cleaned'] += whitespace_cleaned
+        report['case_standardized'] += case_standardized
+        report['invalid_items'] += invalid_items
+        report['duplicate_items'] += duplicate_items
 
-            if len(cleaned_items) >= 2:
-                cleaned_transactions.append(cleaned_items)
+        if len(cleaned_items) == 1:
+            report['single_item_transactions'] += 1
+            return None
 
-        self.report['valid_transactions'] = len(cleaned_transactions)
-        self.report['total_items'] = sum(len(t) for t in cleaned_transactions)
+        if len(cleaned_items) >= 2:
+            return cleaned_items
 
-        unique = set()
-        for transaction in cleaned_transactions:
-            unique.update(transaction)
-        self.report['unique_products'] = len(unique)
+        return None
 
-        return cleaned_transactions, self.report
+    def _normalize_item(self, raw_item: str) -> Tuple[str, bool, bool, bool]:
+        normalized = self._item_cache.get(raw_item)
+        if normalized is None:
+            stripped = raw_item.strip()
+            item = stripped.lower()
+            valid = not self.valid_products or item in self.valid_products
+            normalized = (item, stripped != raw_item, item != stripped, valid)
+            if len(self._item_cache) < ITEM_CACHE_LIMIT:
+                self._item_cache[raw_item] = normalized
+        return normalized
 
     def get_report_string(self) -> str:
         report_lines = [
@@ -120,3 +170,10 @@ def clean_data(transactions_file: str, products_file: str = 'data/products.csv')
     transactions = cleaner.load_transactions(transactions_file)
     cleaned_transactions, report = cleaner.preprocess(transactions)
     return cleaned_transactions, report, cleaner.get_report_string()
+
+
+def clean_data_to_store(transactions_file: str, products_file: str = 'data/products.csv',
+                        chunk_size: int = 10000):
+    cleaner = DataCleaner(products_file)
+    store, report = cleaner.preprocess_to_store(cleaner.iter_transactions(transactions_file), chunk_size)
+    return store, report, cleaner.get_report_string()